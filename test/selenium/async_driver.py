@@ -0,0 +1,358 @@
+import argparse
+import json
+import sys
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+import h11
+import trio
+from selenium.common.exceptions import JavascriptException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+
+import config
+import waits
+from auth import auth_storage
+from dom_snapshot import SNAPSHOT_SCRIPT, encode_queries
+from driver_pool import ORIGIN, RESET_SCRIPT
+from profiles import PROFILES, chrome_options, current_profile
+from waits import WAIT_SCRIPT, PageCondition
+
+# Key W3C WebDriver uses to mark element references in JSON
+ELEMENT_KEY = "element-6066-11e4-a52f-4099b8ac6bf5"
+
+
+class HttpConnection:
+    """One keep-alive HTTP/1.1 connection to the driver, spoken with h11
+
+    Commands of a session are sequential, so requests are serialized with a
+    lock. A request on a reused connection that the driver has meanwhile
+    closed is retried once on a fresh one.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.stream = None
+        self.protocol = None
+        self.lock = trio.Lock()
+
+    async def request(self, method: str, path: str, body=None) -> tuple:
+        data = json.dumps(body).encode() if body is not None else b""
+        async with self.lock:
+            reused = self.stream is not None
+            try:
+                return await self._roundtrip(method, path, data)
+            except (trio.BrokenResourceError, trio.ClosedResourceError, h11.RemoteProtocolError):
+                await self.close()
+                if not reused:
+                    raise
+                return await self._roundtrip(method, path, data)
+
+    async def _roundtrip(self, method: str, path: str, data: bytes) -> tuple:
+        if self.stream is None:
+            self.stream = await trio.open_tcp_stream(self.host, self.port)
+            self.protocol = h11.Connection(h11.CLIENT)
+        headers = [
+            ("Host", f"{self.host}:{self.port}"),
+            ("Content-Type", "application/json;charset=UTF-8"),
+            ("Content-Length", str(len(data))),
+        ]
+        await self.stream.send_all(
+            self.protocol.send(h11.Request(method=method, target=path, headers=headers))
+            + self.protocol.send(h11.Data(data=data))
+            + self.protocol.send(h11.EndOfMessage()))
+
+        status, chunks = None, []
+        while True:
+            event = self.protocol.next_event()
+            if event is h11.NEED_DATA:
+                self.protocol.receive_data(await self.stream.receive_some(65536))
+            elif isinstance(event, h11.Response):
+                status = event.status_code
+            elif isinstance(event, h11.Data):
+                chunks.append(bytes(event.data))
+            elif isinstance(event, h11.EndOfMessage):
+                break
+            elif isinstance(event, h11.ConnectionClosed):
+                raise h11.RemoteProtocolError("connection closed mid-response")
+
+        if self.protocol.our_state is h11.DONE and self.protocol.their_state is h11.DONE:
+            self.protocol.start_next_cycle()
+        else:
+            await self.close()
+        return status, b"".join(chunks).decode()
+
+    async def close(self):
+        if self.stream is not None:
+            stream, self.stream = self.stream, None
+            await stream.aclose()
+
+
+def w3c_locator(by: str, value: str) -> dict:
+    """W3C only knows css, xpath, link text and tag name; map the rest to css"""
+    if by == By.ID:
+        return {"using": By.CSS_SELECTOR, "value": f'[id="{value}"]'}
+    if by == By.NAME:
+        return {"using": By.CSS_SELECTOR, "value": f'[name="{value}"]'}
+    if by == By.CLASS_NAME:
+        return {"using": By.CSS_SELECTOR, "value": f".{value}"}
+    return {"using": by, "value": value}
+
+
+class AsyncElement:
+    def __init__(self, session: "AsyncSession", element_id: str):
+        self.session = session
+        self.id = element_id
+
+    def _path(self, suffix: str = "") -> str:
+        return f"/element/{self.id}{suffix}"
+
+    async def click(self):
+        await self.session.command("POST", self._path("/click"), {})
+
+    async def clear(self):
+        await self.session.command("POST", self._path("/clear"), {})
+
+    async def send_keys(self, text: str):
+        await self.session.command("POST", self._path("/value"), {"text": text})
+
+    @property
+    async def text(self) -> str:
+        return await self.session.command("GET", self._path("/text"))
+
+    async def get_property(self, name: str):
+        return await self.session.command("GET", self._path(f"/property/{name}"))
+
+    async def find_element(self, by: str, value: str) -> "AsyncElement":
+        return self.session._decode(await self.session.command(
+            "POST", self._path("/element"), w3c_locator(by, value)))
+
+    async def find_elements(self, by: str, value: str) -> list:
+        return self.session._decode(await self.session.command(
+            "POST", self._path("/elements"), w3c_locator(by, value)))
+
+    async def scroll_into_view(self):
+        await self.session.execute_script(
+            "arguments[0].scrollIntoView({block: 'center'});", self)
+
+
+class AsyncSession:
+    """Async counterpart of the WebDriver methods the suites use"""
+
+    def __init__(self, connection: HttpConnection, session_id: str):
+        self.connection = connection
+        self.session_id = session_id
+        self.script_timeout = 30
+
+    async def command(self, method: str, path: str, body=None):
+        status, data = await self.connection.request(
+            method, f"/session/{self.session_id}{path}", body)
+        if status >= 400:
+            ErrorHandler().check_response({"status": status, "value": data})
+        return json.loads(data)["value"]
+
+    def _encode(self, value):
+        if isinstance(value, AsyncElement):
+            return {ELEMENT_KEY: value.id}
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._encode(item) for key, item in value.items()}
+        return value
+
+    def _decode(self, value):
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return AsyncElement(self, value[ELEMENT_KEY])
+            return {key: self._decode(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        return value
+
+    async def get(self, url: str):
+        await self.command("POST", "/url", {"url": url})
+
+    @property
+    async def current_url(self) -> str:
+        return await self.command("GET", "/url")
+
+    async def execute_script(self, script: str, *args):
+        return self._decode(await self.command(
+            "POST", "/execute/sync", {"script": script, "args": self._encode(list(args))}))
+
+    async def execute_async_script(self, script: str, *args):
+        return self._decode(await self.command(
+            "POST", "/execute/async", {"script": script, "args": self._encode(list(args))}))
+
+    async def set_script_timeout(self, seconds: float):
+        await self.command("POST", "/timeouts", {"script": int(seconds * 1000)})
+        self.script_timeout = seconds
+
+    async def find_element(self, by: str, value: str) -> AsyncElement:
+        return self._decode(await self.command("POST", "/element", w3c_locator(by, value)))
+
+    async def find_elements(self, by: str, value: str) -> list:
+        return self._decode(await self.command("POST", "/elements", w3c_locator(by, value)))
+
+    async def delete_all_cookies(self):
+        await self.command("DELETE", "/cookie")
+
+    async def reset(self, url: str = config.BASE_URL, local_storage: dict = None):
+        """Same reset as DriverPool.acquire: clear app storage and cookies, then load url"""
+        entries = local_storage or {}
+        on_origin = await self.execute_script(RESET_SCRIPT, ORIGIN, entries)
+        await self.delete_all_cookies()
+        if not on_origin and entries:
+            await self.get(config.BASE_URL)
+            await self.execute_script(RESET_SCRIPT, ORIGIN, entries)
+        await self.get(url)
+
+    async def sign_in(self, email: str, password: str, path: str = "/dashboard"):
+        await self.reset(config.url(path), auth_storage(email, password))
+
+    async def quit(self):
+        await self.connection.request("DELETE", f"/session/{self.session_id}")
+        await self.connection.close()
+
+
+class AsyncEventWait:
+    """EventWait for AsyncSession: the same in-page MutationObserver wait"""
+
+    def __init__(self, session: AsyncSession, timeout: float = 10):
+        self.session = session
+        self.timeout = timeout
+
+    async def until(self, condition: PageCondition, message: str = ""):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self.session.script_timeout < remaining + 1:
+                await self.session.set_script_timeout(max(remaining + 1, 30))
+            try:
+                result = await self.session.execute_async_script(
+                    WAIT_SCRIPT, condition.kind, condition.by, condition.value,
+                    int(remaining * 1000))
+            except JavascriptException as error:
+                # A navigation unloaded the document mid-wait, retry on the new page
+                if "unloaded" not in str(error.msg):
+                    raise
+                continue
+            if result is not None:
+                return result
+            break
+
+        raise TimeoutException(message or f"Timed out waiting for {condition!r}")
+
+
+async def snapshot(session: AsyncSession, queries: dict) -> dict:
+    """dom_snapshot.snapshot for AsyncSession"""
+    return await session.execute_script(SNAPSHOT_SCRIPT, encode_queries(queries))
+
+
+class AsyncBrowsers:
+    """Launches Chrome sessions behind a single chromedriver for one event loop"""
+
+    def __init__(self, profile: str = None):
+        self.profile = profile or current_profile()
+        self.service = ChromeService()
+        self.host = self.port = None
+        self.sessions = []
+
+    async def start_session(self) -> AsyncSession:
+        connection = HttpConnection(self.host, self.port)
+        capabilities = chrome_options(self.profile).to_capabilities()
+        status, data = await connection.request(
+            "POST", "/session", {"capabilities": {"alwaysMatch": capabilities}})
+        if status >= 400:
+            ErrorHandler().check_response({"status": status, "value": data})
+        session = AsyncSession(connection, json.loads(data)["value"]["sessionId"])
+        self.sessions.append(session)
+        return session
+
+    async def start_sessions(self, count: int) -> list:
+        sessions = [None] * count
+
+        async def launch(index):
+            sessions[index] = await self.start_session()
+
+        async with trio.open_nursery() as nursery:
+            for index in range(count):
+                nursery.start_soon(launch, index)
+        return sessions
+
+    async def close(self):
+        with trio.CancelScope(shield=True):
+            async with trio.open_nursery() as nursery:
+                for session in self.sessions:
+                    nursery.start_soon(self._quit, session)
+        self.sessions = []
+        self.service.stop()
+
+    async def _quit(self, session: AsyncSession):
+        try:
+            await session.quit()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def open(self, count: int):
+        """Start the driver and count sessions; everything is quit on exit"""
+        await trio.to_thread.run_sync(self.service.start)
+        address = urlsplit(self.service.service_url)
+        self.host, self.port = address.hostname, address.port
+        try:
+            yield await self.start_sessions(count)
+        finally:
+            await self.close()
+
+
+async def check_users(users: list, browsers: int, profile: str = None) -> dict:
+    """Sign every user in on a shared set of sessions and check the dashboard loads"""
+    results = {}
+    async with AsyncBrowsers(profile).open(browsers) as sessions:
+        queue_send, queue_receive = trio.open_memory_channel(len(users))
+        for user in users:
+            queue_send.send_nowait(user)
+        queue_send.close()
+
+        async def worker(session):
+            async for email, password in queue_receive:
+                started = time.perf_counter()
+                try:
+                    await session.sign_in(email, password)
+                    await AsyncEventWait(session, 15).until(waits.element_to_be_clickable(
+                        (By.ID, "dashboard__action:to-ai-survey")))
+                    results[email] = {"ok": True, "seconds": time.perf_counter() - started}
+                except Exception as error:
+                    results[email] = {"ok": False, "error": str(error).strip()}
+
+        async with trio.open_nursery() as nursery:
+            for session in sessions:
+                nursery.start_soon(worker, session)
+    return results
+
+
+def main(argv=None):
+    from load import load_users
+
+    parser = argparse.ArgumentParser(
+        description="Sign in every user of src/data.json concurrently from one event loop")
+    parser.add_argument("-n", "--browsers", type=int, default=8)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    args = parser.parse_args(argv)
+
+    results = trio.run(check_users, load_users(), args.browsers, args.profile)
+    failed = {email: result for email, result in results.items() if not result["ok"]}
+    for email, result in failed.items():
+        print(f"{email}: {result['error']}", file=sys.stderr)
+    print(f"{len(results) - len(failed)}/{len(results)} users reached the dashboard")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
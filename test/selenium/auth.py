@@ -0,0 +1,30 @@
+import config
+
+# Key AuthProvider (src/context/auth.context.tsx) reads the signed in user from
+AUTH_STORAGE_KEY = "proj3-user"
+
+DEFAULT_USER = ("john.doe@example.com", "P@ssw0rd123")
+
+SET_ENTRY_SCRIPT = """
+const [key, value] = arguments;
+window.localStorage.setItem(key, value);
+"""
+
+
+def auth_storage(email: str, password: str) -> dict:
+    """localStorage entries that make AuthProvider treat the user as signed in"""
+    return {AUTH_STORAGE_KEY: f"{email}:{password}"}
+
+
+def login_as(driver, path: str = "/dashboard", user: tuple = DEFAULT_USER):
+    """Sign in without the login form and deep link to an app route
+
+    Writes the same localStorage entry the login page stores on success, so
+    only tests that cover login itself need to go through the UI.
+    """
+    if not driver.current_url.startswith(config.BASE_URL):
+        driver.get(config.url("/"))
+    email, password = user
+    driver.execute_script(
+        SET_ENTRY_SCRIPT, AUTH_STORAGE_KEY, f"{email}:{password}")
+    driver.get(config.url(path))
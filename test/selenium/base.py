@@ -0,0 +1,46 @@
+import unittest
+
+import config
+import forensics
+from auth import auth_storage
+from driver_pool import get_pool
+from instrumentation import get_tracer
+from wire_replay import WireRecorder, recording_path
+
+
+class SeleniumTestCase(unittest.TestCase):
+    """Borrows a warm browser from the driver pool for each test"""
+
+    # Route the browser is on when the test starts
+    start_path = "/"
+
+    # (email, password) to sign in as before the test, skipping the login UI
+    login_user = None
+
+    def setUp(self):
+        get_tracer().begin_test(self.id())
+        local_storage = auth_storage(*self.login_user) if self.login_user else None
+        self.driver = get_pool().acquire(
+            config.url(self.start_path), local_storage=local_storage)
+        self.recorder = None
+        if config.RECORD_DIR:
+            self.recorder = WireRecorder(self.driver, self.id(), self.start_path, local_storage)
+
+    def tearDown(self):
+        if self.recorder:
+            self.recorder.stop(recording_path(self.id()))
+        if config.FORENSICS and self._failed():
+            forensics.capture(self.driver, self.id())
+        get_pool().release(self.driver)
+        get_tracer().end_test()
+
+    def _failed(self) -> bool:
+        """Whether the test body has failed, asked from tearDown"""
+        outcome = self._outcome
+        if outcome is None:
+            # TestCase.debug() raises instead of collecting outcomes
+            return False
+        if hasattr(outcome, "errors"):
+            # Before Python 3.11 failures wait here until the test is over
+            return any(error for _, error in outcome.errors)
+        return any(test is self for test, _ in outcome.result.failures + outcome.result.errors)
@@ -0,0 +1,155 @@
+import argparse
+import json
+import sys
+from selenium.webdriver.common.by import By
+
+import config
+import waits
+from auth import DEFAULT_USER, auth_storage
+from driver_pool import get_pool
+from page_timing import MEASURE_PRELUDE
+from stats import describe
+from waits import EventWait
+
+MODELS = ["chatgpt", "bard", "claude", "copilot"]
+
+TOGGLE_MODEL_SCRIPT = MEASURE_PRELUDE + """
+const [model, timeout] = arguments;
+const checkbox = byId(`ai-survey__field:model-${model}`);
+const ticking = !checkbox.checked;
+const defectId = `ai-survey__field:modeldefect-${model}`;
+measure(
+    () => checkbox.click(),
+    () => Boolean(byId(defectId)) === ticking,
+    timeout
+);
+"""
+
+SUBMIT_SCRIPT = MEASURE_PRELUDE + """
+const [values, models, errorId, timeout] = arguments;
+for (const model of models) {
+    byId(`ai-survey__field:model-${model}`).click();
+}
+// Let React render the defect fields of the selected models first
+requestAnimationFrame(() => setTimeout(() => {
+    for (const [id, value] of Object.entries(values)) {
+        setValue(byId(id), value);
+    }
+    measure(
+        () => byId("aisurvey-form__action:submit").click(),
+        () => Boolean(byId(errorId)),
+        timeout
+    );
+}, 0));
+"""
+
+VALIDATION_CASES = {
+    "submit_required": ({}, [], "ai-survey__error:full-name"),
+    "submit_format": ({
+        "ai-survey__field:full-name": "123@!",
+        "ai-survey__field:birthdate": "123@!",
+    }, [], "ai-survey__error:full-name"),
+    "submit_max_length": ({
+        "ai-survey__field:full-name": "rowaha",
+        "ai-survey__field:birthdate": "29-10-2001",
+        "ai-survey__field:modeldefect-chatgpt": "This will be increase character length of 10",
+    }, ["chatgpt"], "ai-survey__error:modeldefect-chatgpt"),
+}
+
+TIMEOUT_MS = 10000
+
+
+def wait_for_form(driver):
+    EventWait(driver, 10).until(waits.element_to_be_clickable(
+        (By.ID, "aisurvey-form__action:submit")))
+
+
+def bench_model_toggles(driver, iterations: int) -> dict:
+    """Click-to-render latency of ticking and unticking each model checkbox"""
+    samples = {}
+    for model in MODELS:
+        for _ in range(iterations):
+            for action in ("tick", "untick"):
+                result = driver.execute_async_script(TOGGLE_MODEL_SCRIPT, model, TIMEOUT_MS)
+                samples.setdefault(f"{action}_{model}", []).append(result)
+    return samples
+
+
+def bench_validation(driver, iterations: int) -> dict:
+    """Submit-to-error-message latency of the validation scenarios
+
+    The form re-validates on every change once submitted, so each iteration
+    starts from a freshly loaded page.
+    """
+    samples = {}
+    for name, (values, models, error_id) in VALIDATION_CASES.items():
+        for _ in range(iterations):
+            driver.get(config.url("/ai-survey"))
+            wait_for_form(driver)
+            result = driver.execute_async_script(
+                SUBMIT_SCRIPT, values, models, error_id, TIMEOUT_MS)
+            samples.setdefault(name, []).append(result)
+    return samples
+
+
+def summarize(samples: dict) -> dict:
+    summary = {}
+    for name, results in samples.items():
+        completed = [result for result in results if result["commit_ms"] is not None]
+        summary[name] = {
+            "commit_ms": describe([result["commit_ms"] for result in completed]),
+            "paint_ms": describe([result["paint_ms"] for result in completed]),
+            "timeouts": len(results) - len(completed),
+            "long_tasks": sum(result["long_tasks"] for result in results),
+            "long_task_ms": sum(result["long_task_ms"] for result in results),
+        }
+    return summary
+
+
+def print_summary(summary: dict, stream=sys.stdout):
+    stream.write(f"{'interaction':<22}{'n':>5}{'p50':>9}{'p95':>9}{'p99':>9}"
+                 f"{'paint p95':>11}{'long tasks':>12}{'timeouts':>10}\n")
+    for name, row in summary.items():
+        commit = row["commit_ms"]
+        stream.write(
+            f"{name:<22}{commit['count']:>5}{commit['p50']:>9.1f}{commit['p95']:>9.1f}"
+            f"{commit['p99']:>9.1f}{row['paint_ms']['p95']:>11.1f}{row['long_tasks']:>12}"
+            f"{row['timeouts']:>10}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark interaction latency of the AI survey page")
+    parser.add_argument("-n", "--iterations", type=int, default=50)
+    parser.add_argument("--max-p95-ms", type=float,
+                        help="exit non-zero when any interaction's p95 exceeds this")
+    parser.add_argument("--json", dest="json_path", help="also write the summary to this file")
+    args = parser.parse_args(argv)
+
+    pool = get_pool()
+    driver = pool.acquire(config.url("/ai-survey"), local_storage=auth_storage(*DEFAULT_USER))
+    try:
+        wait_for_form(driver)
+        driver.set_script_timeout(TIMEOUT_MS / 1000 + 5)
+        samples = bench_model_toggles(driver, args.iterations)
+        samples.update(bench_validation(driver, args.iterations))
+    finally:
+        pool.release(driver)
+
+    summary = summarize(samples)
+    print_summary(summary)
+    if args.json_path:
+        with open(args.json_path, "w") as fp:
+            json.dump(summary, fp, indent=2)
+
+    if args.max_p95_ms is not None:
+        slow = [name for name, row in summary.items()
+                if row["timeouts"] or row["commit_ms"]["p95"] > args.max_p95_ms]
+        if slow:
+            print(f"Over {args.max_p95_ms} ms at p95: {', '.join(slow)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
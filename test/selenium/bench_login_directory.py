@@ -0,0 +1,202 @@
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from selenium.webdriver.common.by import By
+
+import config
+import login
+import waits
+from auth import DEFAULT_USER
+from driver_pool import get_pool
+from gen_users import generate, write
+from load import USERS_PATH
+from page_timing import MEASURE_PRELUDE
+from pages import LoginPage
+from static_server import StaticServer, bundle_size, ensure_build
+from stats import describe
+from waits import EventWait
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+# Where src/data.json waits while a generated directory takes its place
+BACKUP_PATH = USERS_PATH + ".svq-backup"
+
+# LoginTest's success and failure paths, run against every directory
+LOGIN_TESTS = ["test_successful_login", "test_no_such_user", "test_unauthorized_login"]
+
+TIMEOUT_MS = 30000
+
+# Bundle parse and evaluation: from the last script downloaded to
+# DOMContentLoaded, which module scripts hold back until they have run
+LOAD_TIMING_SCRIPT = """
+const navigation = performance.getEntriesByType("navigation")[0];
+const scripts = performance.getEntriesByType("resource")
+    .filter((entry) => entry.initiatorType === "script" || entry.name.endsWith(".js"));
+const downloaded = Math.max(navigation.responseEnd, ...scripts.map((entry) => entry.responseEnd));
+return {
+    parse_ms: navigation.domContentLoadedEventEnd - downloaded,
+    dcl_ms: navigation.domContentLoadedEventEnd,
+};
+"""
+
+# Submit-to-message latency of a sign in the page rejects; the lookup runs
+# synchronously in the submit handler, so a slow scan shows up here
+REJECTED_SCRIPT = MEASURE_PRELUDE + """
+const [email, password, message, timeout] = arguments;
+setValue(byId("login-form__field:email"), email);
+setValue(byId("login-form__field:password"), password);
+requestAnimationFrame(() => setTimeout(() => {
+    measure(
+        () => byId("login-form__action:submit").click(),
+        () => {
+            const error = byId("login-form__error:unauthorized");
+            return Boolean(error) && error.textContent.trim() === message;
+        },
+        timeout
+    );
+}, 0));
+"""
+
+REJECTED_CASES = {
+    "no_such_user": ("a@b.com", "b", "No such user found with that email."),
+    "wrong_password": ("john.doe@example.com", "b", "Incorrect password. Please try again."),
+}
+
+
+def restore_directory():
+    """Put back a src/data.json left swapped by an interrupted run"""
+    if os.path.exists(BACKUP_PATH):
+        os.replace(BACKUP_PATH, USERS_PATH)
+
+
+@contextlib.contextmanager
+def swapped_directory(users: list):
+    restore_directory()
+    shutil.copy2(USERS_PATH, BACKUP_PATH)
+    try:
+        write(users, USERS_PATH)
+        yield
+    finally:
+        os.replace(BACKUP_PATH, USERS_PATH)
+
+
+def run_login_tests() -> dict:
+    suite = unittest.TestSuite(login.LoginTest(name) for name in LOGIN_TESTS)
+    with open(os.devnull, "w") as stream:
+        result = unittest.TextTestRunner(stream=stream, verbosity=0).run(suite)
+    failed = [test.id().rsplit(".", 1)[-1] for test, _ in result.failures + result.errors]
+    return {"ran": result.testsRun, "failed": failed}
+
+
+def measure(iterations: int) -> dict:
+    """Latency samples against the app at config.BASE_URL"""
+    samples = {"parse_ms": [], "success": []}
+    pool = get_pool()
+    driver = pool.acquire(config.url("/"))
+    try:
+        driver.set_script_timeout(TIMEOUT_MS / 1000 + 5)
+        for _ in range(iterations):
+            for name, (email, password, message) in REJECTED_CASES.items():
+                driver.get(config.url("/"))
+                samples["parse_ms"].append(driver.execute_script(LOAD_TIMING_SCRIPT)["parse_ms"])
+                result = driver.execute_async_script(
+                    REJECTED_SCRIPT, email, password, message, TIMEOUT_MS)
+                samples.setdefault(name, []).append(result["commit_ms"])
+
+            # Success reloads into /dashboard, so it is timed from here up to
+            # the dashboard being usable, bundle evaluation included
+            driver.get(config.url("/"))
+            page = LoginPage(driver, TIMEOUT_MS / 1000)
+            page.email.send_keys(DEFAULT_USER[0])
+            page.password.send_keys(DEFAULT_USER[1])
+            started = time.perf_counter()
+            page.submit.click()
+            EventWait(driver, TIMEOUT_MS / 1000).until(waits.element_to_be_clickable(
+                (By.ID, "dashboard__action:to-ai-survey")))
+            samples["success"].append((time.perf_counter() - started) * 1000)
+            driver.execute_script("localStorage.removeItem('proj3-user');")
+    finally:
+        pool.release(driver)
+
+    summary = {name: describe([value for value in values if value is not None])
+               for name, values in samples.items()}
+    summary["timeouts"] = sum(value is None for values in samples.values() for value in values)
+    return summary
+
+
+def bench_size(size: int, keep: list, iterations: int, seed: int) -> dict:
+    users = generate(size, seed, keep)
+    with swapped_directory(users):
+        directory_bytes = os.path.getsize(USERS_PATH)
+        dist = ensure_build()
+    row = {"size": size, "directory_bytes": directory_bytes, **bundle_size(dist)}
+
+    server = StaticServer(dist).start()
+    handle, output = tempfile.mkstemp(suffix=".json")
+    os.close(handle)
+    try:
+        # A fresh process, so config.BASE_URL points at this build
+        env = {**os.environ, "SVQ_BASE_URL": server.base_url}
+        env.pop("SVQ_SERVE_DIST", None)
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--worker",
+                        "-n", str(iterations), "--json", output], env=env, check=True)
+        with open(output) as fp:
+            row.update(json.load(fp))
+    finally:
+        os.remove(output)
+        server.stop()
+    return row
+
+
+def print_rows(rows: list, stream=sys.stdout):
+    stream.write(f"{'users':>10}{'json MB':>9}{'js KB':>9}{'gzip KB':>9}{'parse p50':>11}"
+                 f"{'missing p50':>13}{'wrong pw p50':>14}{'success p50':>13}  tests\n")
+    for row in rows:
+        tests = "ok" if not row["tests"]["failed"] else "failed: " + ", ".join(row["tests"]["failed"])
+        stream.write(
+            f"{row['size']:>10}{row['directory_bytes'] / 1024 / 1024:>9.1f}"
+            f"{row['js_bytes'] / 1024:>9.0f}{row['js_gzip_bytes'] / 1024:>9.0f}"
+            f"{row['latency']['parse_ms']['p50']:>11.1f}{row['latency']['no_such_user']['p50']:>13.1f}"
+            f"{row['latency']['wrong_password']['p50']:>14.1f}{row['latency']['success']['p50']:>13.1f}"
+            f"  {tests}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark login lookup, bundle size and parse time against large user directories",
+        epilog="Each size is a new build of the app; SVQ_BUILD_COMMAND='npx vite build' skips "
+               "the type check, which is slow on the 1M directory.")
+    parser.add_argument("-s", "--size", type=int, action="append",
+                        help="directory size, may be repeated (default: 10k, 100k and 1M)")
+    parser.add_argument("-n", "--iterations", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = {"latency": measure(args.iterations), "tests": run_login_tests()}
+        with open(args.json_path, "w") as fp:
+            json.dump(result, fp)
+        return 0
+
+    restore_directory()
+    with open(USERS_PATH) as fp:
+        keep = json.load(fp)
+    rows = [bench_size(size, keep, args.iterations, args.seed) for size in args.size or DEFAULT_SIZES]
+    print_rows(rows)
+    if args.json_path:
+        with open(args.json_path, "w") as fp:
+            json.dump(rows, fp, indent=2)
+    return 1 if any(row["tests"]["failed"] or row["latency"]["timeouts"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import argparse
+import json
+import sys
+from selenium.webdriver.common.by import By
+
+import config
+import waits
+from dom_snapshot import snapshot
+from driver_pool import get_pool
+from page_timing import MEASURE_PRELUDE
+from stats import describe
+from waits import EventWait
+
+QUESTION_TYPES = ["multipleChoice", "ratingScale", "openEnded", "dropdown", "checkboxes"]
+
+QUESTION_BLOCKS = "[data-testid^='question-block-']"
+
+DEFAULT_SIZES = [50, 200, 1000]
+
+TIMEOUT_MS = 30000
+
+HELPERS = """
+function testid(value) {
+    return document.querySelector(`[data-testid='${value}']`);
+}
+
+function questionCount() {
+    return document.querySelectorAll("[data-testid^='question-block-']").length;
+}
+"""
+
+# Clicks the add buttons round robin until the editor holds `target`
+# questions, yielding to React every few clicks so each batch gets committed
+FILL_SCRIPT = HELPERS + """
+const [target, types] = arguments;
+const done = arguments[arguments.length - 1];
+let next = questionCount();
+
+function batch() {
+    for (let i = 0; i < 25 && next < target; i++, next++) {
+        testid(`add-question-${types[next % types.length]}-button`).click();
+    }
+    if (next < target) {
+        setTimeout(batch, 0);
+    } else {
+        requestAnimationFrame(() => setTimeout(() => done(questionCount()), 0));
+    }
+}
+batch();
+"""
+
+ADD_SCRIPT = MEASURE_PRELUDE + HELPERS + """
+const [type, timeout] = arguments;
+const before = questionCount();
+measure(
+    () => testid(`add-question-${type}-button`).click(),
+    () => questionCount() === before + 1,
+    timeout
+);
+"""
+
+TYPE_SCRIPT = MEASURE_PRELUDE + HELPERS + """
+const [id, text, timeout] = arguments;
+const input = testid(`question-${id}-title-input`);
+const expected = input.value + text;
+measure(() => setValue(input, expected), () => input.value === expected, timeout);
+"""
+
+TOGGLE_REQUIRED_SCRIPT = MEASURE_PRELUDE + HELPERS + """
+const [id, timeout] = arguments;
+const checkbox = testid(`question-${id}-required-checkbox`);
+const was = checkbox.checked;
+measure(() => checkbox.click(), () => checkbox.checked !== was, timeout);
+"""
+
+# Radix Select opens on pointerdown rather than click
+OPEN_SELECT_SCRIPT = MEASURE_PRELUDE + HELPERS + """
+const [id, timeout] = arguments;
+const trigger = testid(`conditional-question-select-trigger-${id}`);
+measure(
+    () => trigger.dispatchEvent(new PointerEvent("pointerdown", {
+        bubbles: true, cancelable: true, button: 0, pointerType: "mouse",
+    })),
+    () => Boolean(testid(`conditional-question-select-content-${id}`)),
+    timeout
+);
+"""
+
+CLOSE_SELECT_SCRIPT = HELPERS + """
+const [id] = arguments;
+const done = arguments[arguments.length - 1];
+const target = document.activeElement || document.body;
+target.dispatchEvent(new KeyboardEvent("keydown", { key: "Escape", bubbles: true }));
+(function closed() {
+    if (testid(`conditional-question-select-content-${id}`)) {
+        requestAnimationFrame(closed);
+    } else {
+        done(true);
+    }
+})();
+"""
+
+# AnimatePresence keeps a deleted block in the DOM while it animates out;
+# waiting for it to leave keeps questionCount() and the last block exact for
+# the next iteration
+DELETE_LAST_SCRIPT = HELPERS + """
+const done = arguments[arguments.length - 1];
+const blocks = document.querySelectorAll("[data-testid^='question-block-']");
+const id = blocks[blocks.length - 1].getAttribute("data-testid").replace("question-block-", "");
+testid(`question-${id}-delete-button`).click();
+(function removed() {
+    if (testid(`question-block-${id}`)) {
+        requestAnimationFrame(removed);
+    } else {
+        done(true);
+    }
+})();
+"""
+
+ENABLE_CONDITION_SCRIPT = HELPERS + """
+const [id] = arguments;
+const toggle = testid(`conditional-logic-toggle-${id}`);
+if (!toggle.checked) {
+    toggle.click();
+}
+"""
+
+
+def fill_to(driver, size: int) -> int:
+    return driver.execute_async_script(FILL_SCRIPT, size, QUESTION_TYPES)
+
+
+def middle_question_id(driver) -> str:
+    testids = snapshot(driver, {"ids": (QUESTION_BLOCKS, "each:attr:data-testid")})["ids"]
+    return testids[len(testids) // 2].replace("question-block-", "")
+
+
+def bench_size(driver, iterations: int) -> dict:
+    """Latency samples of every interaction at the editor's current size"""
+    question_id = middle_question_id(driver)
+    driver.execute_script(ENABLE_CONDITION_SCRIPT, question_id)
+    samples = {"add_question": [], "type_title": [], "toggle_required": [], "open_condition_select": []}
+    for i in range(iterations):
+        question_type = QUESTION_TYPES[i % len(QUESTION_TYPES)]
+        samples["add_question"].append(
+            driver.execute_async_script(ADD_SCRIPT, question_type, TIMEOUT_MS))
+        # Keep the size constant across iterations
+        driver.execute_async_script(DELETE_LAST_SCRIPT)
+
+        samples["type_title"].append(
+            driver.execute_async_script(TYPE_SCRIPT, question_id, "x", TIMEOUT_MS))
+        samples["toggle_required"].append(
+            driver.execute_async_script(TOGGLE_REQUIRED_SCRIPT, question_id, TIMEOUT_MS))
+        samples["open_condition_select"].append(
+            driver.execute_async_script(OPEN_SELECT_SCRIPT, question_id, TIMEOUT_MS))
+        driver.execute_async_script(CLOSE_SELECT_SCRIPT, question_id)
+    return samples
+
+
+def curve(results: dict) -> dict:
+    """{interaction: [{size, p50, p95, ...}]} for plotting latency against size"""
+    table = {}
+    for size, samples in results.items():
+        for interaction, measurements in samples.items():
+            completed = [m["commit_ms"] for m in measurements if m["commit_ms"] is not None]
+            table.setdefault(interaction, []).append({
+                "size": size,
+                **describe(completed),
+                "timeouts": len(measurements) - len(completed),
+                "long_task_ms": sum(m["long_task_ms"] for m in measurements),
+            })
+    return table
+
+
+def print_curve(table: dict, stream=sys.stdout):
+    for interaction, points in table.items():
+        stream.write(f"\n{interaction}\n{'questions':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'long tasks ms':>15}\n")
+        for point in points:
+            stream.write(
+                f"{point['size']:>10}{point['p50']:>10.1f}{point['p95']:>10.1f}"
+                f"{point['p99']:>10.1f}{point['long_task_ms']:>15.0f}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure survey editor interaction latency as the survey grows")
+    parser.add_argument("-s", "--size", type=int, action="append", dest="sizes",
+                        help=f"number of questions to measure at, may be repeated "
+                             f"(default: {DEFAULT_SIZES})")
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("--json", dest="json_path", help="also write the curve to this file")
+    args = parser.parse_args(argv)
+
+    pool = get_pool()
+    driver = pool.acquire(config.url("/create-survey"))
+    results = {}
+    try:
+        EventWait(driver, 10).until(waits.element_to_be_clickable(
+            (By.CSS_SELECTOR, "[data-testid='add-question-openEnded-button']")))
+        driver.set_script_timeout(600)
+        for size in sorted(args.sizes or DEFAULT_SIZES):
+            reached = fill_to(driver, size)
+            print(f"Measuring at {reached} questions", file=sys.stderr)
+            results[reached] = bench_size(driver, args.iterations)
+    finally:
+        pool.release(driver)
+
+    table = curve(results)
+    print_curve(table)
+    if args.json_path:
+        with open(args.json_path, "w") as fp:
+            json.dump(table, fp, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+import argparse
+import contextlib
+import json
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+from selenium.webdriver.remote.webdriver import WebDriver
+
+import config
+import forensics
+from driver_pool import ORIGIN, RESET_SCRIPT, DriverPool
+from instrumentation import get_tracer
+from profiles import PROFILES, current_profile, new_chrome
+
+DEFAULT_ADDRESS = "127.0.0.1:4455"
+
+# Seconds between attempts to relaunch a dead session, doubling up to the max
+RELAUNCH_DELAY = 1
+RELAUNCH_MAX_DELAY = 30
+
+
+def parse_address(address: str) -> tuple:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class Broker:
+    """Keeps a fixed number of launched Chrome sessions parked on the app
+
+    Sessions are handed out one lease at a time. A returned session is wiped
+    (app storage, cookies) and navigated back to the base url before it is
+    leased again; one that no longer responds is quit and replaced. The
+    forensics buffer is installed once per session, when it is launched.
+    """
+
+    def __init__(self, size: int, profile: str = None, factory=new_chrome):
+        self.size = size
+        self.profile = profile or current_profile()
+        self.factory = factory
+        self.condition = threading.Condition()
+        self.idle = []
+        self.leased = 0
+        self.replaced = 0
+        self.closed = False
+
+    def start(self):
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            for driver in executor.map(lambda _: self._launch(), range(self.size)):
+                self._park(driver)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            drivers, self.idle = self.idle, []
+        for driver in drivers:
+            self._quit(driver)
+
+    def lease(self, timeout: float):
+        """An idle, responsive session or None once timeout seconds have passed"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.condition:
+                if not self.condition.wait_for(
+                        lambda: self.idle or self.closed, deadline - time.monotonic()):
+                    return None
+                if self.closed:
+                    return None
+                driver = self.idle.pop()
+                self.leased += 1
+            try:
+                driver.current_url
+                return driver
+            except WebDriverException:
+                # Crashed while parked: replaced in the background while this
+                # lease keeps waiting, within its own deadline
+                with self.condition:
+                    self.leased -= 1
+                self._replace(driver)
+
+    def give_back(self, driver):
+        with self.condition:
+            self.leased -= 1
+        try:
+            self._warm(driver)
+        except WebDriverException:
+            self._replace(driver)
+            return
+        self._park(driver)
+
+    def status(self) -> dict:
+        with self.condition:
+            return {"size": self.size, "idle": len(self.idle), "leased": self.leased,
+                    "replaced": self.replaced, "profile": self.profile}
+
+    def _launch(self):
+        driver = self.factory(self.profile)
+        try:
+            forensics.install(driver)
+            self._warm(driver)
+        except WebDriverException:
+            self._quit(driver)
+            raise
+        return driver
+
+    def _replace(self, driver):
+        """Quit a dead session and relaunch its slot on a thread of its own"""
+        threading.Thread(target=self._replace_slot, args=(driver,),
+                         name="svq-relaunch", daemon=True).start()
+
+    def _replace_slot(self, dead):
+        self._quit(dead)
+        driver = self._relaunch()
+        if driver is None:
+            return
+        with self.condition:
+            self.replaced += 1
+        self._park(driver)
+
+    def _relaunch(self):
+        """A new session for a dead one, retried until it starts or the broker closes
+
+        Giving up would shrink the broker by one slot for the rest of its life.
+        """
+        delay = RELAUNCH_DELAY
+        while True:
+            with self.condition:
+                if self.closed:
+                    return None
+            try:
+                return self._launch()
+            except (WebDriverException, OSError) as error:
+                print(f"Relaunching a browser failed, retrying in {delay}s: "
+                      f"{str(error).strip()}", file=sys.stderr)
+            time.sleep(delay)
+            delay = min(delay * 2, RELAUNCH_MAX_DELAY)
+
+    def _warm(self, driver):
+        driver.execute_script(RESET_SCRIPT, ORIGIN, {})
+        driver.delete_all_cookies()
+        driver.get(config.BASE_URL)
+
+    def _park(self, driver):
+        with self.condition:
+            if not self.closed:
+                self.idle.append(driver)
+                self.condition.notify()
+                return
+        self._quit(driver)
+
+    def _quit(self, driver):
+        with contextlib.suppress(WebDriverException):
+            driver.quit()
+
+
+class BrokerHandler(socketserver.StreamRequestHandler):
+    """One client connection: JSON requests and replies, one per line
+
+    {"op": "lease", "timeout": 30} answers with the executor url, session id
+    and capabilities of a session; {"op": "release"} or closing the
+    connection returns it. {"op": "status"} reports the broker's counters.
+    """
+
+    def handle(self):
+        broker = self.server.broker
+        driver = None
+        try:
+            for line in self.rfile:
+                request = json.loads(line)
+                returned = None
+                if request["op"] == "lease" and driver is None:
+                    driver = broker.lease(request.get("timeout", config.BROKER_LEASE_TIMEOUT))
+                    if driver is None:
+                        reply = {"error": "no browser became free in time"}
+                    else:
+                        reply = {
+                            "executor": driver.service.service_url,
+                            "session_id": driver.session_id,
+                            "capabilities": driver.caps,
+                            "forensics": getattr(driver, "_svq_forensics", False),
+                        }
+                elif request["op"] == "release" and driver is not None:
+                    returned, driver = driver, None
+                    reply = {"ok": True}
+                elif request["op"] == "status":
+                    reply = broker.status()
+                else:
+                    reply = {"error": f"unexpected {request['op']!r}"}
+                self.wfile.write(json.dumps(reply).encode() + b"\n")
+                if returned is not None:
+                    # Reset after replying so the client is not kept waiting
+                    broker.give_back(returned)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            if driver is not None:
+                broker.give_back(driver)
+
+
+class BrokerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple, broker: Broker):
+        super().__init__(address, BrokerHandler)
+        self.broker = broker
+
+
+class AttachedChrome(WebDriver):
+    """WebDriver client for a session that already runs in the broker"""
+
+    def __init__(self, executor: str, session_id: str, capabilities: dict, forensics: bool = False):
+        self._attach_to = (session_id, capabilities)
+        super().__init__(
+            command_executor=ChromiumRemoteConnection(executor, "goog", "chrome"),
+            options=ChromeOptions())
+        # The broker installs the buffer once per session; a new client per
+        # lease must not add the script to every document again
+        self._svq_forensics = forensics
+
+    def start_session(self, capabilities: dict) -> None:
+        # Take over the broker's session instead of creating a new one
+        self.session_id, self.caps = self._attach_to
+
+
+class Lease:
+    """A session borrowed from the broker, held for as long as the connection is open"""
+
+    def __init__(self, address: str, timeout: float):
+        self.connection = socket.create_connection(parse_address(address))
+        self.stream = self.connection.makefile("rwb")
+        reply = self._request({"op": "lease", "timeout": timeout})
+        if "error" in reply:
+            self.close()
+            raise TimeoutException(f"Broker at {address}: {reply['error']} ({timeout}s)")
+        self.driver = AttachedChrome(reply["executor"], reply["session_id"], reply["capabilities"],
+                                     reply.get("forensics", False))
+
+    def _request(self, request: dict) -> dict:
+        self.stream.write(json.dumps(request).encode() + b"\n")
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise ConnectionError("broker closed the connection")
+        return json.loads(line)
+
+    def release(self):
+        with contextlib.suppress(OSError):
+            self._request({"op": "release"})
+        self.close()
+
+    def close(self):
+        with contextlib.suppress(OSError):
+            self.stream.close()
+            self.connection.close()
+
+
+class BrokerPool(DriverPool):
+    """DriverPool that leases sessions from a broker instead of launching them"""
+
+    def __init__(self, address: str = config.BROKER, timeout: float = config.BROKER_LEASE_TIMEOUT):
+        super().__init__()
+        self.address = address
+        self.timeout = timeout
+        self._leases = {}
+
+    def acquire(self, url: str = config.BASE_URL, local_storage: dict = None):
+        """A leased session showing url, or TimeoutException after self.timeout seconds
+
+        Sessions that fail the reset are returned and another one is leased,
+        all within the same timeout.
+        """
+        tracer = get_tracer()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(
+                    f"Broker at {self.address}: no usable browser within {self.timeout}s")
+            with tracer.span("startup", "lease"):
+                lease = Lease(self.address, remaining)
+            driver = tracer.instrument(lease.driver)
+            try:
+                self._prepare(driver, url, local_storage or {})
+            except WebDriverException:
+                # The broker replaces the session once it is back
+                lease.release()
+                continue
+            self._leases[id(driver)] = lease
+            return driver
+
+    def release(self, driver):
+        lease = self._leases.pop(id(driver), None)
+        if lease:
+            lease.release()
+
+    def close(self):
+        while self._leases:
+            self._leases.popitem()[1].release()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Keep warm Chrome sessions ready for test processes to lease")
+    parser.add_argument("-n", "--browsers", type=int, default=4)
+    parser.add_argument("--address", default=config.BROKER or DEFAULT_ADDRESS,
+                        help=f"host:port to listen on (default: $SVQ_BROKER or {DEFAULT_ADDRESS})")
+    parser.add_argument("--profile", choices=sorted(PROFILES),
+                        help="browser profile of the sessions (default: $SVQ_PROFILE or default)")
+    args = parser.parse_args(argv)
+
+    broker = Broker(args.browsers, args.profile)
+    broker.start()
+    server = BrokerServer(parse_address(args.address), broker)
+    print(f"Broker listening on {args.address} with {args.browsers} "
+          f"{broker.profile} browsers on {config.BASE_URL}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        broker.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import os
+
+if os.environ.get("SVQ_SERVE_DIST") and not os.environ.get("SVQ_BASE_URL"):
+    # Serve the production build instead of relying on `npm run dev`. The url
+    # goes into the environment so worker processes reuse the same server.
+    import static_server
+    os.environ["SVQ_BASE_URL"] = static_server.serve_dist()
+
+BASE_URL = os.environ.get("SVQ_BASE_URL", "http://localhost:5173").rstrip("/")
+
+# Where failing checks leave screenshots, logs, heap snapshots and the like
+ARTIFACTS_DIR = os.environ.get(
+    "SVQ_ARTIFACTS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts"))
+
+# Number of tests a pooled browser session may serve before it is relaunched
+POOL_MAX_USES = int(os.environ.get("SVQ_POOL_MAX_USES", "20"))
+
+# host:port of a running broker.py; tests then lease warm browsers from it
+BROKER = os.environ.get("SVQ_BROKER")
+
+# Seconds a test waits for a browser from the broker before giving up
+BROKER_LEASE_TIMEOUT = float(os.environ.get("SVQ_BROKER_LEASE_TIMEOUT", "120"))
+
+# Directory to record each test's WebDriver command stream to, for wire_replay.py
+RECORD_DIR = os.environ.get("SVQ_RECORD")
+
+# Buffer browser errors in the page and save them, a screenshot and the DOM
+# when a test fails (SVQ_FORENSICS=0 turns it off)
+FORENSICS = os.environ.get("SVQ_FORENSICS", "1") != "0"
+
+# Console, exception and network entries the in-page buffer keeps
+FORENSICS_BUFFER = int(os.environ.get("SVQ_FORENSICS_BUFFER", "200"))
+
+
+def url(path: str = "/") -> str:
+    """Absolute url of an app route, e.g. url("/dashboard")"""
+    return BASE_URL + path
@@ -0,0 +1,90 @@
+SNAPSHOT_SCRIPT = """
+const [queries] = arguments;
+
+function readOne(node, prop) {
+    if (prop === "element") {
+        return node;
+    }
+    if (prop === "value") {
+        return node.value;
+    }
+    if (prop === "text") {
+        return node.innerText;
+    }
+    if (prop === "checked") {
+        return "checked" in node ? node.checked : node.getAttribute("aria-checked") === "true";
+    }
+    if (prop === "disabled") {
+        return Boolean(node.disabled);
+    }
+    if (prop === "visible") {
+        return node.getClientRects().length > 0;
+    }
+    if (prop.startsWith("attr:")) {
+        return node.getAttribute(prop.slice(5));
+    }
+    throw new Error("Unknown snapshot property: " + prop);
+}
+
+function read(nodes, prop) {
+    if (prop === "count") {
+        return nodes.length;
+    }
+    if (prop === "exists") {
+        return nodes.length > 0;
+    }
+    if (prop.startsWith("each:")) {
+        return nodes.map((node) => readOne(node, prop.slice(5)));
+    }
+    if (prop.startsWith("last:")) {
+        return nodes.length ? readOne(nodes[nodes.length - 1], prop.slice(5)) : null;
+    }
+    return nodes.length ? readOne(nodes[0], prop) : null;
+}
+
+const snapshot = {};
+for (const [key, [selector, props, single]] of Object.entries(queries)) {
+    const nodes = Array.from(document.querySelectorAll(selector));
+    const values = {};
+    for (const prop of props) {
+        values[prop] = read(nodes, prop);
+    }
+    snapshot[key] = single ? values[props[0]] : values;
+}
+return snapshot;
+"""
+
+
+def by_id(element_id: str) -> str:
+    """CSS selector for an id, safe for ids like "ai-survey__field:full-name" """
+    return f'[id="{element_id}"]'
+
+
+def by_testid(testid: str) -> str:
+    return f"[data-testid='{testid}']"
+
+
+def snapshot(driver, queries: dict) -> dict:
+    """Read the state of many elements in a single round trip
+
+    queries maps a name to (css selector, prop) or (css selector, [props]).
+    Properties: exists, count, element, value, text, checked, disabled,
+    visible and attr:<name>. They read the first match unless prefixed with
+    last: or each: (a list over all matches). A single prop yields its value,
+    a list of props yields a dict keyed by prop.
+
+        state = snapshot(driver, {
+            "name": (by_id("ai-survey__field:full-name"), "value"),
+            "blocks": ("[data-testid^='question-block-']", ["count", "last:element"]),
+        })
+    """
+    return driver.execute_script(SNAPSHOT_SCRIPT, encode_queries(queries))
+
+
+def encode_queries(queries: dict) -> dict:
+    """The argument SNAPSHOT_SCRIPT expects for snapshot() queries"""
+    payload = {}
+    for key, (selector, props) in queries.items():
+        single = isinstance(props, str)
+        payload[key] = [selector, [props] if single else list(props), single]
+    return payload
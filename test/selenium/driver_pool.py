@@ -0,0 +1,114 @@
+import multiprocessing.util
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+
+import config
+import forensics
+from instrumentation import get_tracer
+from profiles import current_profile, new_chrome
+
+ORIGIN = "{0.scheme}://{0.netloc}".format(urlsplit(config.BASE_URL))
+
+RESET_SCRIPT = """
+const [origin, entries] = arguments;
+if (window.location.origin !== origin) {
+    return false;
+}
+window.localStorage.removeItem("proj3-user");
+// Empty the forensics buffer, which would otherwise carry over into the next test
+if (window.__svqForensics) {
+    window.__svqForensics.length = 0;
+}
+window.sessionStorage.removeItem("svq-forensics");
+for (const [key, value] of Object.entries(entries)) {
+    window.localStorage.setItem(key, value);
+}
+return true;
+"""
+
+
+class DriverPool:
+    """Hands out warm WebDriver sessions instead of launching one per test
+
+    A driver is reset on acquire: the proj3-user localStorage key and cookies
+    are cleared and the browser is navigated to the requested url (the base
+    url by default). A session that fails the reset is considered unhealthy
+    and replaced. Sessions are
+    relaunched after serving max_uses tests to keep long runs from drifting.
+    """
+
+    def __init__(self, factory=new_chrome, max_uses: int = config.POOL_MAX_USES):
+        self.factory = factory
+        self.max_uses = max_uses
+        self._idle = []
+        self._uses = {}
+
+    def acquire(self, url: str = config.BASE_URL, local_storage: dict = None):
+        """Return a reset driver showing url
+
+        local_storage entries (e.g. a signed in user) are written before the
+        navigation, so the page boots with them already in place.
+        """
+        while self._idle:
+            driver = self._idle.pop()
+            try:
+                self._prepare(driver, url, local_storage or {})
+                return driver
+            except WebDriverException:
+                self._discard(driver)
+
+        tracer = get_tracer()
+        with tracer.span("startup", f"launch:{current_profile()}"):
+            driver = tracer.instrument(self.factory())
+        self._uses[id(driver)] = 0
+        self._prepare(driver, url, local_storage or {})
+        return driver
+
+    def release(self, driver):
+        self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+        if self._uses[id(driver)] >= self.max_uses:
+            self._discard(driver)
+        else:
+            self._idle.append(driver)
+
+    def close(self):
+        while self._idle:
+            self._discard(self._idle.pop())
+
+    def _prepare(self, driver, url: str, entries: dict):
+        forensics.install(driver)
+        # The reset script doubles as the health check of a pooled session
+        on_origin = driver.execute_script(RESET_SCRIPT, ORIGIN, entries)
+        driver.delete_all_cookies()
+        if not on_origin and entries:
+            # Fresh sessions start on about:blank which has no app storage
+            driver.get(config.BASE_URL)
+            driver.execute_script(RESET_SCRIPT, ORIGIN, entries)
+        driver.get(url)
+
+    def _discard(self, driver):
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+
+_pool = None
+
+
+def get_pool() -> DriverPool:
+    """Process wide pool, closed when the process exits
+
+    With SVQ_BROKER set, sessions are leased from the broker at that address.
+    """
+    global _pool
+    if _pool is None:
+        if config.BROKER:
+            from broker import BrokerPool
+            _pool = BrokerPool()
+        else:
+            _pool = DriverPool()
+        # Unlike atexit, Finalize also runs in multiprocessing workers
+        multiprocessing.util.Finalize(None, _pool.close, exitpriority=10)
+    return _pool
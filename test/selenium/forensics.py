@@ -0,0 +1,170 @@
+import base64
+import json
+import multiprocessing.util
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from selenium.common.exceptions import WebDriverException
+
+import config
+
+# sessionStorage key the buffer survives full page loads under; the pool's
+# reset clears it so every test starts with an empty buffer
+STORAGE_KEY = "svq-forensics"
+
+# Installed once per browser, runs before the app's scripts in every
+# document. Keeps the last LIMIT console errors and warnings, uncaught
+# errors, failed resource loads and failed fetch/XHR requests in memory.
+BUFFER_SCRIPT = """
+(() => {
+    if (window.__svqForensics) {
+        return;
+    }
+    const KEY = "%(key)s";
+    const LIMIT = %(limit)d;
+    let entries = [];
+    try {
+        entries = JSON.parse(sessionStorage.getItem(KEY)) || [];
+    } catch (error) {}
+    window.__svqForensics = entries;
+
+    function describe(value) {
+        if (value instanceof Error) {
+            return value.stack || String(value);
+        }
+        if (value && typeof value === "object") {
+            try {
+                return JSON.stringify(value);
+            } catch (error) {}
+        }
+        return String(value);
+    }
+
+    function push(kind, message) {
+        entries.push({ time: Date.now(), url: location.href, kind, message: message.slice(0, 2000) });
+        if (entries.length > LIMIT) {
+            entries.splice(0, entries.length - LIMIT);
+        }
+    }
+
+    for (const level of ["error", "warn"]) {
+        const original = console[level];
+        console[level] = function (...args) {
+            push(`console.${level}`, args.map(describe).join(" "));
+            return original.apply(this, args);
+        };
+    }
+
+    addEventListener("error", (event) => {
+        const target = event.target;
+        if (target && target !== window && (target.src || target.href)) {
+            push("resource", `failed to load ${target.src || target.href}`);
+        } else {
+            push("exception", event.error ? describe(event.error) : String(event.message));
+        }
+    }, true);
+    addEventListener("unhandledrejection", (event) => push("rejection", describe(event.reason)));
+
+    const fetch = window.fetch;
+    window.fetch = function (...args) {
+        const url = args[0] && args[0].url ? args[0].url : String(args[0]);
+        return fetch.apply(this, args).then((response) => {
+            if (!response.ok) {
+                push("network", `${response.status} ${url}`);
+            }
+            return response;
+        }, (error) => {
+            push("network", `${describe(error)} ${url}`);
+            throw error;
+        });
+    };
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        this.addEventListener("loadend", () => {
+            if (this.status === 0 || this.status >= 400) {
+                push("network", `${this.status} ${this.responseURL}`);
+            }
+        });
+        return send.apply(this, args);
+    };
+
+    addEventListener("pagehide", () => {
+        try {
+            sessionStorage.setItem(KEY, JSON.stringify(entries));
+        } catch (error) {}
+    });
+})();
+"""
+
+# Everything but the screenshot in one round trip
+CAPTURE_SCRIPT = """
+return {
+    url: location.href,
+    title: document.title,
+    entries: window.__svqForensics || [],
+    dom: document.documentElement.outerHTML,
+};
+"""
+
+_writer = None
+
+
+def install(driver):
+    """Start buffering in every document the driver loads from now on"""
+    if not config.FORENSICS or getattr(driver, "_svq_forensics", False):
+        return driver
+    driver._svq_forensics = True
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+            "source": BUFFER_SCRIPT % {"key": STORAGE_KEY, "limit": config.FORENSICS_BUFFER}})
+    except WebDriverException:
+        # Not a Chromium session; failures then only get the screenshot and DOM
+        pass
+    return driver
+
+
+def _get_writer() -> ThreadPoolExecutor:
+    global _writer
+    if _writer is None:
+        _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="svq-forensics")
+        # Finish pending writes before the process (or pool worker) exits
+        multiprocessing.util.Finalize(None, _writer.shutdown, exitpriority=20)
+    return _writer
+
+
+def capture(driver, test_id: str) -> str:
+    """Save what the browser shows for a failed test, returns the directory
+
+    The two browser round trips happen here, before the session is reset;
+    decoding and writing the files is left to a background thread.
+    """
+    directory = os.path.join(config.ARTIFACTS_DIR, "forensics", re.sub(r"[^\w.-]", "_", test_id))
+    state = screenshot = None
+    try:
+        state = driver.execute_script(CAPTURE_SCRIPT)
+    except WebDriverException as error:
+        state = {"error": str(error).strip()}
+    try:
+        screenshot = driver.get_screenshot_as_base64()
+    except WebDriverException:
+        pass
+    _get_writer().submit(_write, directory, state, screenshot)
+    return directory
+
+
+def _write(directory: str, state: dict, screenshot: str):
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if screenshot:
+            with open(os.path.join(directory, "screenshot.png"), "wb") as fp:
+                fp.write(base64.b64decode(screenshot))
+        dom = state.pop("dom", None)
+        if dom is not None:
+            with open(os.path.join(directory, "dom.html"), "w") as fp:
+                fp.write(dom)
+        with open(os.path.join(directory, "console.json"), "w") as fp:
+            json.dump(state, fp, indent=2)
+        print(f"Failure artifacts in {directory}", file=sys.stderr)
+    except OSError as error:
+        print(f"Could not save failure artifacts to {directory}: {error}", file=sys.stderr)
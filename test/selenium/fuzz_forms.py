@@ -0,0 +1,305 @@
+import json
+import os
+import random
+import re
+import string
+import time
+import unittest
+
+import config
+from auth import DEFAULT_USER
+from base import SeleniumTestCase
+from page_timing import MEASURE_PRELUDE
+
+CASES = int(os.environ.get("SVQ_FUZZ_CASES", "2000"))
+BATCH_SIZE = int(os.environ.get("SVQ_FUZZ_BATCH", "500"))
+# Reported with every failure so a run can be replayed with SVQ_FUZZ_SEED
+SEED = int(os.environ.get("SVQ_FUZZ_SEED", str(int(time.time()))))
+
+# Characters JavaScript's \s matches (Python's differs: no \ufeff, adds \x1c-\x1f)
+JS_WHITESPACE = set("\t\n\v\f\r \u00a0\u1680\u2028\u2029\u202f\u205f\u3000\ufeff") | {
+    chr(code) for code in range(0x2000, 0x200b)}
+
+EMAIL_PATTERN = re.compile(r"[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}", re.IGNORECASE | re.ASCII)
+DATE_PATTERN = re.compile(r"([0-9]{2})-([0-9]{2})-([0-9]{4})")
+
+# Awkward characters mixed into generated inputs
+UNICODE_SAMPLES = [
+    "\u00e9", "\u00df", "\u00f1", "\u03a9", "\u0436", "\u4e2d", "\u0627", "\u017f", "\u212a", "\u0301",
+    "\u00a0", "\u2003", "\u3000", "\ufeff", "\u200b", "\x1c", "\t", "\x0b",
+    "\U0001f600", "\U0001f469\u200d\U0001f4bb", "\u0663", "\uff11",
+]
+
+
+# Oracles: the message the page should show for a value, None for no error
+
+def name_error(value: str):
+    if value == "":
+        return "Name is required"
+    if all(char in string.ascii_letters or char in JS_WHITESPACE or char in "'-" for char in value):
+        return None
+    return "Name contains invalid characters"
+
+
+def is_leap(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def birthdate_error(value: str):
+    """Luxon's DateTime.fromFormat(value, "dd-MM-yyyy").isValid"""
+    if value == "":
+        return "Birth Date is required"
+    match = DATE_PATTERN.fullmatch(value)
+    if match:
+        day, month, year = (int(part) for part in match.groups())
+        days = [31, 29 if is_leap(year) else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+        if 1 <= month <= 12 and 1 <= day <= days[month - 1]:
+            return None
+    return "Birth Date is invalid"
+
+
+def defect_error(value: str):
+    # maxLength counts UTF-16 code units, like String.length
+    if len(value.encode("utf-16-le")) // 2 > 10:
+        return "Defect/con cannot exceed 10 characters"
+    return None
+
+
+def email_error(value: str):
+    if value == "":
+        return "Email is required"
+    return None if EMAIL_PATTERN.fullmatch(value) else "Invalid email address"
+
+
+# Generators: a mix of valid values, near misses and noise
+
+def random_text(rng: random.Random, alphabet, max_length: int) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+
+
+def insert_one(rng: random.Random, value: str, alphabet) -> str:
+    position = rng.randint(0, len(value))
+    return value[:position] + rng.choice(alphabet) + value[position:]
+
+
+def gen_name(rng: random.Random) -> str:
+    words = [random_text(rng, string.ascii_letters, 8) or "a" for _ in range(rng.randint(1, 4))]
+    valid = "".join(word + rng.choice([" ", "-", "'", "  "]) for word in words).rstrip()
+    strategy = rng.random()
+    if strategy < 0.3:
+        return valid
+    if strategy < 0.7:
+        return insert_one(rng, valid, string.digits + string.punctuation + "".join(UNICODE_SAMPLES))
+    if strategy < 0.8:
+        return random_text(rng, sorted(JS_WHITESPACE) + ["\x1c", "\u200b"], 3)
+    return random_text(rng, string.printable + "".join(UNICODE_SAMPLES), 20)
+
+
+def gen_birthdate(rng: random.Random) -> str:
+    year = rng.choice([rng.randint(1900, 2030), rng.randint(0, 9999), 2000, 1900, 2024, 2023])
+    month = rng.choice([rng.randint(1, 12)] * 4 + [0, 2, 13])
+    day = rng.choice([rng.randint(1, 28)] * 4 + [29, 30, 31, 0, 32])
+    value = f"{day:02d}-{month:02d}-{year:04d}"
+    strategy = rng.random()
+    if strategy < 0.5:
+        return value
+    if strategy < 0.6:
+        return f"{day}-{month}-{year}"
+    if strategy < 0.7:
+        return value.replace("-", rng.choice(["/", ".", " ", "--"]))
+    if strategy < 0.8:
+        position = rng.choice([i for i, char in enumerate(value) if char.isdigit()])
+        # Arabic-Indic and fullwidth digits are not [0-9]
+        digit = rng.choice("\u0660\u0661\u0662\u0663\u0669\uff10\uff11\uff12")
+        return value[:position] + digit + value[position + 1:]
+    if strategy < 0.9:
+        return rng.choice([" ", "", "0"]) + value + rng.choice([" ", "", "0", "T"])
+    return random_text(rng, string.digits + "-", 12)
+
+
+def gen_defect(rng: random.Random) -> str:
+    alphabet = string.ascii_letters + string.digits + " " + "".join(UNICODE_SAMPLES)
+    length = rng.choice([rng.randint(0, 20), 9, 10, 11])
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def gen_email(rng: random.Random) -> str:
+    local_alphabet = string.ascii_letters + string.digits + "._%+-"
+    local = random_text(rng, local_alphabet, 12) or "a"
+    domain = ".".join(random_text(rng, string.ascii_letters + string.digits + "-", 8) or "b"
+                      for _ in range(rng.randint(1, 3)))
+    tld = "".join(rng.choice(string.ascii_letters) for _ in range(rng.choice([1, 2, 3, 6])))
+    valid = f"{local}@{domain}.{tld}"
+    strategy = rng.random()
+    if strategy < 0.35:
+        return valid
+    if strategy < 0.7:
+        return insert_one(rng, valid, string.punctuation + " " + "".join(UNICODE_SAMPLES))
+    if strategy < 0.8:
+        return rng.choice([valid.replace("@", ""), valid.replace("@", "@@"), valid + ".",
+                           valid[:-1] + "\u212a", valid.rstrip(string.ascii_letters)])
+    return random_text(rng, string.printable, 25)
+
+
+# What each fuzz target types into, which error it reads, and the fields held
+# invalid so the form never submits while it is being fuzzed
+TARGETS = {
+    "full_name": {
+        "field": "ai-survey__field:full-name",
+        "error": "ai-survey__error:full-name",
+        "hold": {"ai-survey__field:birthdate": "invalid"},
+        "models": [],
+        "submit": "aisurvey-form__action:submit",
+        "generate": gen_name,
+        "oracle": name_error,
+    },
+    "birthdate": {
+        "field": "ai-survey__field:birthdate",
+        "error": "ai-survey__error:birthdate",
+        "hold": {"ai-survey__field:full-name": "1"},
+        "models": [],
+        "submit": "aisurvey-form__action:submit",
+        "generate": gen_birthdate,
+        "oracle": birthdate_error,
+    },
+    "model_defect": {
+        "field": "ai-survey__field:modeldefect-chatgpt",
+        "error": "ai-survey__error:modeldefect-chatgpt",
+        "hold": {"ai-survey__field:full-name": "1"},
+        "models": ["chatgpt"],
+        "submit": "aisurvey-form__action:submit",
+        "generate": gen_defect,
+        "oracle": defect_error,
+    },
+    "email": {
+        "field": "login-form__field:email",
+        "error": "login-form__error:email",
+        "hold": {"login-form__field:password": ""},
+        "models": [],
+        "submit": "login-form__action:submit",
+        "generate": gen_email,
+        "oracle": email_error,
+    },
+}
+
+SETTLE = """
+// Validation resolves in microtasks and React commits the result in a
+// scheduler task; a message posted after it runs once that task is done
+async function settle(frames) {
+    await new Promise((resolve) => setTimeout(resolve, 0));
+    await new Promise((resolve) => {
+        const channel = new MessageChannel();
+        channel.port1.onmessage = resolve;
+        channel.port2.postMessage(null);
+    });
+    for (let i = 0; i < frames; i++) {
+        await new Promise((resolve) => requestAnimationFrame(() => setTimeout(resolve, 0)));
+    }
+}
+"""
+
+# Submits once with the held fields invalid, which switches the form to
+# validating on every change
+SETUP_SCRIPT = MEASURE_PRELUDE + SETTLE + """
+const [hold, models, submitId] = arguments;
+(async () => {
+    for (const model of models) {
+        byId(`ai-survey__field:model-${model}`).click();
+    }
+    await settle(1);
+    for (const [id, value] of Object.entries(hold)) {
+        setValue(byId(id), value);
+    }
+    byId(submitId).click();
+    await settle(1);
+    done(true);
+})().catch((error) => done(String(error)));
+"""
+
+# Types each input and reads back the value and the error message it produced
+BATCH_SCRIPT = MEASURE_PRELUDE + SETTLE + """
+const [fieldId, errorId, inputs, frames] = arguments;
+const field = byId(fieldId);
+(async () => {
+    const results = [];
+    for (const input of inputs) {
+        setValue(field, input);
+        await settle(frames);
+        const error = byId(errorId);
+        results.push([field.value, error ? error.textContent.trim() : null]);
+    }
+    done(results);
+})().catch((error) => done(String(error)));
+"""
+
+
+class FormFuzzMixin:
+    """Pushes generated inputs through a form field and checks every message"""
+
+    def fuzz(self, target_name: str):
+        target = TARGETS[target_name]
+        rng = random.Random(f"{SEED}:{target_name}")
+        inputs = [target["generate"](rng) for _ in range(CASES)]
+
+        self.driver.set_script_timeout(max(120, BATCH_SIZE))
+        setup = self.driver.execute_async_script(
+            SETUP_SCRIPT, target["hold"], target["models"], target["submit"])
+        self.assertIs(setup, True, f"Form setup failed: {setup}")
+
+        suspects = self._mismatches(target, inputs, frames=0)
+        # Recheck suspects with a couple of frames to spare before reporting
+        mismatches = self._mismatches(target, [case["input"] for case in suspects], frames=2)
+        if not mismatches:
+            return
+
+        os.makedirs(config.ARTIFACTS_DIR, exist_ok=True)
+        path = os.path.join(config.ARTIFACTS_DIR, f"{self.id()}-{SEED}.json")
+        with open(path, "w") as fp:
+            json.dump(mismatches, fp, indent=2, ensure_ascii=False)
+        examples = "\n".join(
+            f"  {case['input']!r}: page {case['page']!r}, expected {case['expected']!r}"
+            for case in mismatches[:10])
+        self.fail(f"{len(mismatches)} of {len(inputs)} {target_name} inputs disagree with the "
+                  f"rule (SVQ_FUZZ_SEED={SEED}, all saved to {path}):\n{examples}")
+
+    def _mismatches(self, target: dict, inputs: list, frames: int) -> list:
+        mismatches = []
+        for start in range(0, len(inputs), BATCH_SIZE):
+            batch = inputs[start:start + BATCH_SIZE]
+            results = self.driver.execute_async_script(
+                BATCH_SCRIPT, target["field"], target["error"], batch, frames)
+            self.assertIsInstance(results, list, f"Fuzz batch failed: {results}")
+            for text, (value, message) in zip(batch, results):
+                # The oracle judges what the field holds; text inputs drop newlines
+                expected = target["oracle"](value)
+                if message != expected:
+                    mismatches.append({"input": text, "value": value,
+                                       "page": message, "expected": expected})
+        return mismatches
+
+
+class AiSurveyFuzzTest(FormFuzzMixin, SeleniumTestCase):
+
+    start_path = "/ai-survey"
+    login_user = DEFAULT_USER
+
+    def test_full_name_rule(self):
+        self.fuzz("full_name")
+
+    def test_birthdate_rule(self):
+        self.fuzz("birthdate")
+
+    def test_model_defect_rule(self):
+        self.fuzz("model_defect")
+
+
+class LoginFuzzTest(FormFuzzMixin, SeleniumTestCase):
+
+    start_path = "/"
+
+    def test_email_rule(self):
+        self.fuzz("email")
+
+
+if __name__ == '__main__':
+    unittest.main()
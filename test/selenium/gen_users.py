@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import random
+import string
+import sys
+
+from load import USERS_PATH
+
+FIRST_NAMES = [
+    "john", "jane", "michael", "emily", "david", "sarah", "ahmet", "ayse", "mehmet", "zeynep",
+    "wei", "li", "maria", "jose", "fatima", "omar", "anna", "ivan", "yuki", "kenji",
+]
+LAST_NAMES = [
+    "doe", "smith", "jones", "watson", "clark", "yilmaz", "kaya", "demir", "wang", "zhang",
+    "garcia", "lopez", "khan", "ali", "novak", "petrov", "sato", "tanaka", "brown", "miller",
+]
+DOMAINS = ["example.com", "example.org", "mail.example.net", "bilkent.example.edu"]
+
+PASSWORD_ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*"
+
+
+def generate(count: int, seed: int = 0, keep: list = (), position: str = "end") -> list:
+    """count users in the src/data.json schema, keep included unchanged
+
+    The kept users (the ones the suites sign in with) go at the end by
+    default, so the login page's linear scan walks the whole directory before
+    it finds them, like it does for an unknown email.
+    """
+    rng = random.Random(seed)
+    keep = list(keep)
+    taken = {user["email"] for user in keep}
+    generated = []
+    index = len(keep)
+    while len(generated) < count - len(keep):
+        index += 1
+        email = (f"{rng.choice(FIRST_NAMES)}.{rng.choice(LAST_NAMES)}{index}"
+                 f"@{rng.choice(DOMAINS)}")
+        if email in taken:
+            continue
+        password = "".join(rng.choice(PASSWORD_ALPHABET) for _ in range(rng.randint(10, 14)))
+        generated.append({"id": str(index), "email": email, "password": password})
+    return generated + keep if position == "end" else keep + generated
+
+
+def write(users: list, path: str):
+    # Compact: at a million users the indented form is mostly whitespace
+    with open(path, "w") as fp:
+        json.dump(users, fp, separators=(",", ":"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate a user directory in the schema of src/data.json")
+    parser.add_argument("-n", "--count", type=int, required=True)
+    parser.add_argument("-o", "--output", required=True,
+                        help="file to write (src/data.json is only swapped by bench_login_directory.py)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--position", choices=["start", "end"], default="end",
+                        help="where the existing users of src/data.json go (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if os.path.abspath(args.output) == os.path.abspath(USERS_PATH):
+        parser.error("refusing to overwrite src/data.json, write elsewhere")
+    with open(USERS_PATH) as fp:
+        keep = json.load(fp)
+    users = generate(args.count, args.seed, keep, args.position)
+    write(users, args.output)
+    print(f"{len(users)} users written to {args.output} "
+          f"({os.path.getsize(args.output) / 1024 / 1024:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
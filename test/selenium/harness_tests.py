@@ -0,0 +1,48 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from instrumentation import get_tracer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class TracedWork(unittest.TestCase):
+    """Browserless tests run by RunnerTraceTest inside runner worker processes"""
+
+    def test_first(self):
+        get_tracer().record("check", "worker", time.perf_counter())
+
+    def test_second(self):
+        get_tracer().record("check", "worker", time.perf_counter())
+
+
+class RunnerTraceTest(unittest.TestCase):
+    """The merged trace of a parallel run holds the workers' events"""
+
+    def test_parallel_run_keeps_worker_events(self):
+        with tempfile.TemporaryDirectory() as directory:
+            trace = os.path.join(directory, "trace.json")
+            env = {**os.environ, "SVQ_TRACE": trace,
+                   "SVQ_TIMING_DB": os.path.join(directory, "timings.sqlite3")}
+            process = subprocess.Popen(
+                [sys.executable, os.path.join(HERE, "runner.py"), "-j", "2",
+                 "-m", "harness_tests", "-k", "TracedWork"],
+                cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            _, stderr = process.communicate(timeout=120)
+            self.assertEqual(process.returncode, 0, stderr.decode())
+            self.assertTrue(os.path.exists(trace), "no worker wrote its trace part")
+
+            with open(trace) as fp:
+                events = json.load(fp)["traceEvents"]
+            pids = [event["pid"] for event in events if event["cat"] == "check"]
+            self.assertEqual(len(pids), 2)
+            self.assertNotIn(process.pid, pids)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import contextlib
+import glob
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import time
+
+# Path of the trace file to write, tracing is off when unset
+TRACE_PATH = os.environ.get("SVQ_TRACE")
+
+SUMMARY_SIZE = 10
+
+
+class Tracer:
+    """Records per-command, per-wait and per-test latency as trace events
+
+    Each process keeps its own events and writes them to a part file next to
+    the trace when it exits; the main process merges the parts into a single
+    Chrome trace-event file (viewable in chrome://tracing or Perfetto).
+    """
+
+    def __init__(self, path: str = TRACE_PATH):
+        self.path = path
+        self.enabled = bool(path)
+        self.events = []
+        self.current_test = None
+        self._test_started = None
+
+    def record(self, category: str, name: str, started: float, ended: float = None, **args):
+        if not self.enabled:
+            return
+        ended = time.perf_counter() if ended is None else ended
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": started * 1e6,
+            "dur": (ended - started) * 1e6,
+            "pid": os.getpid(),
+            "tid": 0,
+            "args": {"test": self.current_test, **args},
+        })
+
+    @contextlib.contextmanager
+    def span(self, category: str, name: str, **args):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, started, **args)
+
+    def begin_test(self, test_id: str):
+        self.current_test = test_id
+        self._test_started = time.perf_counter()
+
+    def end_test(self):
+        if self._test_started is not None:
+            self.record("test", self.current_test, self._test_started)
+        self.current_test = None
+        self._test_started = None
+
+    def instrument(self, driver):
+        """Time every WebDriver command the driver sends"""
+        if not self.enabled or getattr(driver, "_svq_instrumented", False):
+            return driver
+        execute = driver.execute
+
+        def timed_execute(driver_command, params=None):
+            started = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                self.record("command", driver_command, started)
+
+        driver.execute = timed_execute
+        driver._svq_instrumented = True
+        return driver
+
+    def flush(self):
+        if not self.enabled or not self.events:
+            return
+        with open(f"{self.path}.{os.getpid()}.part", "w") as fp:
+            json.dump(self.events, fp)
+        self.events = []
+
+
+def merge(path: str = TRACE_PATH, stream=sys.stderr):
+    """Combine the part files of every process into the final trace"""
+    parts = sorted(glob.glob(f"{glob.escape(path)}.*.part"))
+    events = []
+    for part in parts:
+        with open(part) as fp:
+            events.extend(json.load(fp))
+    if not parts:
+        return
+
+    summary = summarize(events)
+    with open(path, "w") as fp:
+        json.dump({"traceEvents": events, "otherData": summary}, fp)
+    for part in parts:
+        os.remove(part)
+    write_summary(summary, stream)
+    stream.write(f"Trace written to {path}\n")
+
+
+def summarize(events: list) -> dict:
+    tests = sorted((event for event in events if event["cat"] == "test"),
+                   key=lambda event: event["dur"], reverse=True)
+
+    commands = {}
+    for event in events:
+        if event["cat"] in ("command", "wait", "startup"):
+            key = f"{event['cat']}:{event['name']}"
+            stats = commands.setdefault(
+                key, {"name": key, "count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += event["dur"] / 1000
+            stats["max_ms"] = max(stats["max_ms"], event["dur"] / 1000)
+
+    return {
+        "slowest_tests": [
+            {"test": event["name"], "ms": event["dur"] / 1000}
+            for event in tests[:SUMMARY_SIZE]
+        ],
+        "slowest_commands": sorted(
+            commands.values(), key=lambda stats: stats["total_ms"], reverse=True
+        )[:SUMMARY_SIZE],
+    }
+
+
+def write_summary(summary: dict, stream=sys.stderr):
+    stream.write("\nSlowest tests:\n")
+    for test in summary["slowest_tests"]:
+        stream.write(f"  {test['ms']:10.1f} ms  {test['test']}\n")
+    stream.write("\nSlowest commands (by total time):\n")
+    for stats in summary["slowest_commands"]:
+        mean = stats["total_ms"] / stats["count"]
+        stream.write(
+            f"  {stats['total_ms']:10.1f} ms  {stats['count']:5d}x  "
+            f"mean {mean:8.1f} ms  max {stats['max_ms']:8.1f} ms  {stats['name']}\n")
+
+
+def _finish(tracer: Tracer):
+    tracer.flush()
+    if multiprocessing.parent_process() is None:
+        merge(tracer.path)
+
+
+_tracer = None
+_tracer_pid = None
+
+
+def get_tracer() -> Tracer:
+    """Process wide tracer, flushed (and merged in the main process) on exit
+
+    A forked worker inherits the parent's tracer but not its finalizers
+    (multiprocessing clears them in the child), so each process gets a tracer
+    of its own, registered for its own exit.
+    """
+    global _tracer, _tracer_pid
+    if _tracer is None or _tracer_pid != os.getpid():
+        _tracer = Tracer()
+        _tracer_pid = os.getpid()
+        if _tracer.enabled:
+            # Lower priority than the driver pool so quitting browsers is traced
+            multiprocessing.util.Finalize(None, _finish, args=(_tracer,), exitpriority=5)
+    return _tracer
@@ -0,0 +1,151 @@
+from selenium.common.exceptions import JavascriptException, TimeoutException
+
+from instrumentation import get_tracer
+from waits import LOCATE_FUNCTIONS, PageCondition, ensure_script_timeout
+
+# Runs a list of steps in the page in one call. Each step first waits for its
+# element like EventWait does; clicks and typing go through the DOM, which
+# React handles like user input.
+STEPS_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const [steps, timeout] = arguments;
+const deadline = performance.now() + timeout;
+""" + LOCATE_FUNCTIONS + """
+function waitFor(kind, by, value) {
+    return new Promise((resolve, reject) => {
+        const initial = locate(kind, by, value);
+        if (initial !== null) {
+            return resolve(initial);
+        }
+        let finished = false;
+        let frame = null;
+        const observer = new MutationObserver(tick);
+        const timer = setTimeout(() => {
+            stop();
+            reject(new Error(`Timed out waiting for ${kind} ${by}=${value}`));
+        }, Math.max(0, deadline - performance.now()));
+
+        function stop() {
+            finished = true;
+            observer.disconnect();
+            cancelAnimationFrame(frame);
+            clearTimeout(timer);
+        }
+
+        function tick() {
+            const result = locate(kind, by, value);
+            if (!finished && result !== null) {
+                stop();
+                resolve(result);
+            }
+        }
+
+        function onFrame() {
+            tick();
+            if (!finished) {
+                frame = requestAnimationFrame(onFrame);
+            }
+        }
+
+        observer.observe(document, { childList: true, subtree: true, attributes: true, characterData: true });
+        frame = requestAnimationFrame(onFrame);
+    });
+}
+
+// React commits the state an event caused before the next frame
+function settle() {
+    return new Promise((resolve) => requestAnimationFrame(() => setTimeout(resolve, 0)));
+}
+
+// The native setter bypasses React's value tracking, so the input event
+// that follows is seen as a change
+function setValue(element, value) {
+    const prototype = Object.getPrototypeOf(element);
+    Object.getOwnPropertyDescriptor(prototype, "value").set.call(element, value);
+    element.dispatchEvent(new Event("input", { bubbles: true }));
+    element.dispatchEvent(new Event("change", { bubbles: true }));
+}
+
+(async () => {
+    const results = [];
+    for (const step of steps) {
+        const target = await waitFor(step.kind, step.by, step.value);
+        if (step.op === "expect") {
+            results.push(target);
+            continue;
+        }
+        target.scrollIntoView({ block: "center" });
+        if (step.op === "click") {
+            target.click();
+            await settle();
+            results.push(["checkbox", "radio"].includes(target.type) ? target.checked : null);
+        } else {
+            target.focus();
+            setValue(target, step.text);
+            await settle();
+            results.push(target.value);
+        }
+    }
+    return results;
+})().then(
+    (results) => done({ results }),
+    (error) => done({ error: String(error && error.message ? error.message : error) })
+);
+"""
+
+
+def click(locator, condition: str = "clickable") -> dict:
+    """Step: wait for the element, scroll it into view and click it"""
+    return {"op": "click", "kind": condition, "by": locator[0], "value": locator[1]}
+
+
+def fill(locator, text: str) -> dict:
+    """Step: wait for the field and set its value with input and change events"""
+    return {"op": "fill", "kind": "present", "by": locator[0], "value": locator[1], "text": text}
+
+
+def expect(condition: PageCondition) -> dict:
+    """Step: wait for a condition from waits, e.g. absence_of_element_located"""
+    return {"op": "expect", "kind": condition.kind, "by": condition.by, "value": condition.value}
+
+
+def perform(driver, steps: list, timeout: float = 10) -> list:
+    """Run steps in one round trip; returns one result per step
+
+    A click gives the checkbox or radio state after it (None for other
+    elements), a fill the value the field ended up with, an expect the
+    element (True for absence). A click step only dispatches click, so
+    controls that react to pointer events instead, like Radix selects (open
+    on pointerdown, pick on pointerup), need WebDriver input or their own
+    dispatched pointer events, as bench_survey_editor.OPEN_SELECT_SCRIPT does.
+    """
+    with get_tracer().span("interaction", "+".join(step["op"] for step in steps)):
+        ensure_script_timeout(driver, timeout)
+        outcome = driver.execute_async_script(STEPS_SCRIPT, steps, int(timeout * 1000))
+    if "error" in outcome:
+        if outcome["error"].startswith("Timed out"):
+            raise TimeoutException(outcome["error"])
+        raise JavascriptException(outcome["error"])
+    return outcome["results"]
+
+
+def scroll_and_click(driver, locator, then: PageCondition = None, timeout: float = 10):
+    """Click the element once clickable; returns what then resolves to, if given"""
+    if then is None:
+        perform(driver, [click(locator)], timeout)
+        return None
+    return perform(driver, [click(locator), expect(then)], timeout)[1]
+
+
+def fill_fields(driver, fields: dict, timeout: float = 10) -> list:
+    """Set {locator: text} in order; returns the values the fields hold"""
+    return perform(driver, [fill(locator, text) for locator, text in fields.items()], timeout)
+
+
+def toggle_and_await(driver, locator, then: PageCondition, timeout: float = 10) -> tuple:
+    """Click a checkbox and wait for what it reveals or hides
+
+    Returns the checked state and what then resolves to.
+    """
+    checked, result = perform(driver, [click(locator), expect(then)], timeout)
+    return checked, result
@@ -0,0 +1,145 @@
+import itertools
+import json
+import math
+import os
+import time
+import unittest
+from selenium.webdriver.common.by import By
+import trio
+
+import config
+from ai_survey import AiSurveyHelpers
+from auth import DEFAULT_USER
+from base import SeleniumTestCase
+from survey_editor import SurveyEditorHelpers
+
+CYCLES = int(os.environ.get("SVQ_LEAK_CYCLES", "2000"))
+WARMUP_CYCLES = int(os.environ.get("SVQ_LEAK_WARMUP", "50"))
+SAMPLE_EVERY = int(os.environ.get("SVQ_LEAK_SAMPLE_EVERY", "100"))
+
+# Growth over the post-warmup baseline that counts as a leak when it persists
+HEAP_THRESHOLD_BYTES = float(os.environ.get("SVQ_LEAK_HEAP_MB", "5")) * 1024 * 1024
+NODES_THRESHOLD = int(os.environ.get("SVQ_LEAK_NODES", "2000"))
+
+
+def sample_memory(driver) -> dict:
+    """JS heap and DOM node counts after a forced garbage collection"""
+    driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+    metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+    values = {metric["name"]: metric["value"] for metric in metrics}
+    return {
+        "heap_bytes": values["JSHeapUsedSize"],
+        "nodes": values["Nodes"],
+        "listeners": values["JSEventListeners"],
+    }
+
+
+async def _take_heap_snapshot(driver, path: str):
+    async with driver.bidi_connection() as connection:
+        session, devtools = connection.session, connection.devtools
+        # Chunks arrive before the command returns, so buffer all of them
+        chunks = session.listen(devtools.heap_profiler.AddHeapSnapshotChunk, buffer_size=math.inf)
+        await session.execute(devtools.heap_profiler.enable())
+        await session.execute(devtools.heap_profiler.take_heap_snapshot(report_progress=False))
+        with open(path, "w") as fp:
+            while True:
+                try:
+                    fp.write(chunks.receive_nowait().chunk)
+                except trio.WouldBlock:
+                    break
+
+
+def take_heap_snapshot(driver, path: str):
+    """Write a .heapsnapshot file that can be loaded and diffed in DevTools"""
+    trio.run(_take_heap_snapshot, driver, path)
+
+
+def sustained_growth(samples: list, key: str, threshold: float) -> float:
+    """How far the second half of the samples stays above the first sample
+
+    Using the minimum of the second half ignores one-off spikes, so only
+    memory that keeps growing and is never given back is reported.
+    """
+    if len(samples) < 3:
+        return 0
+    baseline = samples[0][key]
+    tail = samples[len(samples) // 2:]
+    growth = min(sample[key] for sample in tail) - baseline
+    return growth if growth > threshold else 0
+
+
+class LeakCheckMixin:
+    """Repeats a cycle many times and fails if memory keeps growing"""
+
+    def run_cycles(self, cycle):
+        self.driver.execute_cdp_cmd("Performance.enable", {})
+        for _ in range(WARMUP_CYCLES):
+            cycle()
+
+        os.makedirs(config.ARTIFACTS_DIR, exist_ok=True)
+        prefix = os.path.join(config.ARTIFACTS_DIR, f"{self.id()}-{int(time.time())}")
+        baseline_snapshot = f"{prefix}-baseline.heapsnapshot"
+        take_heap_snapshot(self.driver, baseline_snapshot)
+
+        samples = [sample_memory(self.driver)]
+        for index in range(1, CYCLES + 1):
+            cycle()
+            if index % SAMPLE_EVERY == 0:
+                samples.append(sample_memory(self.driver))
+
+        heap_growth = sustained_growth(samples, "heap_bytes", HEAP_THRESHOLD_BYTES)
+        node_growth = sustained_growth(samples, "nodes", NODES_THRESHOLD)
+        if not heap_growth and not node_growth:
+            os.remove(baseline_snapshot)
+            return
+
+        take_heap_snapshot(self.driver, f"{prefix}-final.heapsnapshot")
+        with open(f"{prefix}-samples.json", "w") as fp:
+            json.dump(samples, fp, indent=2)
+        self.fail(
+            f"Memory kept growing over {CYCLES} cycles: "
+            f"heap +{heap_growth / 1024 / 1024:.1f} MB, DOM nodes +{node_growth:.0f}. "
+            f"Heap snapshots and samples saved as {prefix}-*")
+
+
+class SurveyEditorLeakTest(LeakCheckMixin, SurveyEditorHelpers, SeleniumTestCase):
+
+    start_path = "/create-survey"
+
+    def test_add_remove_question_cycles(self):
+        question_types = ["multipleChoice", "ratingScale", "openEnded", "dropdown", "checkboxes"]
+        cycles = itertools.count()
+
+        def cycle():
+            question_type = question_types[next(cycles) % len(question_types)]
+            q_id, block = self._add_question_and_get_id(f"add-question-{question_type}-button")
+            toggle = block.find_element(
+                By.CSS_SELECTOR, f"[data-testid='conditional-logic-toggle-{q_id}']")
+            toggle.click()
+            toggle.click()
+            block.find_element(
+                By.CSS_SELECTOR, f"[data-testid='question-{q_id}-delete-button']").click()
+
+        self.run_cycles(cycle)
+
+
+class AiSurveyLeakTest(LeakCheckMixin, AiSurveyHelpers, SeleniumTestCase):
+
+    start_path = "/ai-survey"
+    login_user = DEFAULT_USER
+
+    def test_fill_reset_cycles(self):
+        def cycle():
+            self.page.full_name.send_keys("cs project")
+            self.page.scroll_into_view("ai-survey__field:model-chatgpt")
+            self.page.model_checkbox("chatgpt").click()
+            self.page.scroll_into_view("ai-survey__field:modeldefect-chatgpt")
+            self.page.model_defect("chatgpt").send_keys("defect")
+            self.page.scroll_into_view("aisurvey-form__action:reset")
+            self.page.reset.click()
+
+        self.run_cycles(cycle)
+
+
+if __name__ == '__main__':
+    unittest.main()
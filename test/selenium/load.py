@@ -0,0 +1,408 @@
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import trio
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+import config
+import waits
+from async_driver import AsyncBrowsers, AsyncEventWait
+from profiles import PROFILES, new_chrome
+from stats import describe
+from waits import EventWait
+
+USERS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "src", "data.json")
+
+
+def load_users(path: str = USERS_PATH) -> list:
+    with open(path) as fp:
+        return [(user["email"], user["password"]) for user in json.load(fp)]
+
+
+class Recorder:
+    """Thread safe store of step latencies and outcomes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.steps = {}
+        self.errors = {}
+        self.journeys = {}
+
+    @contextlib.contextmanager
+    def step(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            with self.lock:
+                self.errors[name] = self.errors.get(name, 0) + 1
+            raise
+        else:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.steps.setdefault(name, []).append(elapsed * 1000)
+
+    def journey(self, name: str, ok: bool):
+        with self.lock:
+            counts = self.journeys.setdefault(name, {"ok": 0, "failed": 0})
+            counts["ok" if ok else "failed"] += 1
+
+
+def wait_for(driver, condition):
+    return EventWait(driver, 15).until(condition)
+
+
+def journey_login(driver, user, recorder: Recorder):
+    email, password = user
+    with recorder.step("login.open"):
+        driver.get(config.url("/"))
+        email_field = wait_for(driver, waits.presence_of_element_located(
+            (By.ID, "login-form__field:email")))
+    with recorder.step("login.submit"):
+        email_field.send_keys(email)
+        driver.find_element(By.ID, "login-form__field:password").send_keys(password)
+        driver.find_element(By.ID, "login-form__action:submit").click()
+        wait_for(driver, waits.url_to_be(config.url("/dashboard")))
+
+
+def journey_ai_survey(driver, user, recorder: Recorder):
+    journey_login(driver, user, recorder)
+    with recorder.step("ai_survey.open"):
+        wait_for(driver, waits.element_to_be_clickable(
+            (By.ID, "dashboard__action:to-ai-survey"))).click()
+        fullname = wait_for(driver, waits.element_to_be_clickable(
+            (By.ID, "ai-survey__field:full-name")))
+    with recorder.step("ai_survey.fill"):
+        fullname.send_keys("Load Test")
+        driver.find_element(By.ID, "ai-survey__field:birthdate").send_keys("29-10-2001")
+        driver.execute_script(
+            "arguments[0].scrollIntoView({block: 'center'});",
+            driver.find_element(By.ID, "ai-survey__field:model-chatgpt"))
+        driver.find_element(By.ID, "ai-survey__field:model-chatgpt").click()
+        wait_for(driver, waits.element_to_be_clickable(
+            (By.ID, "ai-survey__field:modeldefect-chatgpt"))).send_keys("slow")
+    with recorder.step("ai_survey.submit"):
+        submit = driver.find_element(By.ID, "aisurvey-form__action:submit")
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", submit)
+        submit.click()
+        wait_for(driver, waits.url_to_be(config.url("/dashboard")))
+
+
+def journey_create_survey(driver, user, recorder: Recorder):
+    journey_login(driver, user, recorder)
+    with recorder.step("create_survey.open"):
+        wait_for(driver, waits.element_to_be_clickable(
+            (By.ID, "dashboard__action:to-create-survey"))).click()
+        title = wait_for(driver, waits.presence_of_element_located(
+            (By.CSS_SELECTOR, "[data-testid='survey-title-input']")))
+    with recorder.step("create_survey.build"):
+        title.clear()
+        title.send_keys("Load test survey")
+        for question_type in ("multipleChoice", "openEnded", "ratingScale"):
+            driver.find_element(
+                By.CSS_SELECTOR, f"[data-testid='add-question-{question_type}-button']").click()
+        blocks = driver.find_elements(By.CSS_SELECTOR, "[data-testid^='question-block-']")
+        for block in blocks:
+            block.find_element(
+                By.CSS_SELECTOR, "[data-testid$='-title-input']").send_keys("Question")
+    with recorder.step("create_survey.save"):
+        driver.find_element(By.CSS_SELECTOR, "[data-testid='save-survey-button']").click()
+
+
+JOURNEYS = {
+    "login": journey_login,
+    "ai_survey": journey_ai_survey,
+    "create_survey": journey_create_survey,
+}
+
+
+async def await_for(session, condition):
+    return await AsyncEventWait(session, 15).until(condition)
+
+
+async def async_journey_login(session, user, recorder: Recorder):
+    email, password = user
+    with recorder.step("login.open"):
+        await session.get(config.url("/"))
+        email_field = await await_for(session, waits.presence_of_element_located(
+            (By.ID, "login-form__field:email")))
+    with recorder.step("login.submit"):
+        await email_field.send_keys(email)
+        await (await session.find_element(By.ID, "login-form__field:password")).send_keys(password)
+        await (await session.find_element(By.ID, "login-form__action:submit")).click()
+        await await_for(session, waits.url_to_be(config.url("/dashboard")))
+
+
+async def async_journey_ai_survey(session, user, recorder: Recorder):
+    await async_journey_login(session, user, recorder)
+    with recorder.step("ai_survey.open"):
+        await (await await_for(session, waits.element_to_be_clickable(
+            (By.ID, "dashboard__action:to-ai-survey")))).click()
+        fullname = await await_for(session, waits.element_to_be_clickable(
+            (By.ID, "ai-survey__field:full-name")))
+    with recorder.step("ai_survey.fill"):
+        await fullname.send_keys("Load Test")
+        await (await session.find_element(By.ID, "ai-survey__field:birthdate")).send_keys("29-10-2001")
+        model = await session.find_element(By.ID, "ai-survey__field:model-chatgpt")
+        await model.scroll_into_view()
+        await model.click()
+        await (await await_for(session, waits.element_to_be_clickable(
+            (By.ID, "ai-survey__field:modeldefect-chatgpt")))).send_keys("slow")
+    with recorder.step("ai_survey.submit"):
+        submit = await session.find_element(By.ID, "aisurvey-form__action:submit")
+        await submit.scroll_into_view()
+        await submit.click()
+        await await_for(session, waits.url_to_be(config.url("/dashboard")))
+
+
+async def async_journey_create_survey(session, user, recorder: Recorder):
+    await async_journey_login(session, user, recorder)
+    with recorder.step("create_survey.open"):
+        await (await await_for(session, waits.element_to_be_clickable(
+            (By.ID, "dashboard__action:to-create-survey")))).click()
+        title = await await_for(session, waits.presence_of_element_located(
+            (By.CSS_SELECTOR, "[data-testid='survey-title-input']")))
+    with recorder.step("create_survey.build"):
+        await title.clear()
+        await title.send_keys("Load test survey")
+        for question_type in ("multipleChoice", "openEnded", "ratingScale"):
+            await (await session.find_element(
+                By.CSS_SELECTOR, f"[data-testid='add-question-{question_type}-button']")).click()
+        blocks = await session.find_elements(By.CSS_SELECTOR, "[data-testid^='question-block-']")
+        for block in blocks:
+            await (await block.find_element(
+                By.CSS_SELECTOR, "[data-testid$='-title-input']")).send_keys("Question")
+    with recorder.step("create_survey.save"):
+        await (await session.find_element(
+            By.CSS_SELECTOR, "[data-testid='save-survey-button']")).click()
+
+
+ASYNC_JOURNEYS = {
+    "login": async_journey_login,
+    "ai_survey": async_journey_ai_survey,
+    "create_survey": async_journey_create_survey,
+}
+
+
+class VirtualUsers:
+    """Runs journeys on a fixed set of browsers (headless by default)"""
+
+    def __init__(self, browsers: int, journeys: list, recorder: Recorder,
+                 profile: str = "fast"):
+        self.browsers = browsers
+        self.profile = profile
+        self.journeys = journeys
+        self.recorder = recorder
+        self.users = itertools.cycle(load_users())
+        self.plan = itertools.cycle(journeys)
+        self.plan_lock = threading.Lock()
+        self.drivers = queue.Queue()
+        self.all_drivers = []
+
+    def start(self):
+        with ThreadPoolExecutor(max_workers=self.browsers) as executor:
+            for driver in executor.map(lambda _: new_chrome(self.profile), range(self.browsers)):
+                self.all_drivers.append(driver)
+                self.drivers.put(driver)
+
+    def stop(self):
+        for driver in self.all_drivers:
+            with contextlib.suppress(WebDriverException):
+                driver.quit()
+
+    def run_one(self, arrived: float = None):
+        with self.plan_lock:
+            name, user = next(self.plan), next(self.users)
+        driver = self.drivers.get()
+        if arrived is not None:
+            # Time an arriving journey spent waiting for a free browser
+            with self.recorder.lock:
+                self.recorder.steps.setdefault("queue_wait", []).append(
+                    (time.perf_counter() - arrived) * 1000)
+        try:
+            driver.delete_all_cookies()
+            with contextlib.suppress(WebDriverException):
+                driver.execute_script("window.localStorage.clear();")
+            JOURNEYS[name](driver, user, self.recorder)
+            self.recorder.journey(name, True)
+        except Exception:
+            self.recorder.journey(name, False)
+        finally:
+            self.drivers.put(driver)
+
+
+def run_closed(users: VirtualUsers, duration: float):
+    """Every browser runs journeys back to back (fixed concurrency)"""
+    deadline = time.monotonic() + duration
+
+    def loop():
+        while time.monotonic() < deadline:
+            users.run_one()
+
+    with ThreadPoolExecutor(max_workers=users.browsers) as executor:
+        for _ in range(users.browsers):
+            executor.submit(loop)
+
+
+def run_open(users: VirtualUsers, duration: float, rate: float):
+    """Journeys arrive at a fixed rate and queue for a free browser"""
+    interval = 1 / rate
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=users.browsers) as executor:
+        arrival = 0
+        while True:
+            due = started + arrival * interval
+            if due - started >= duration:
+                break
+            time.sleep(max(0, due - time.monotonic()))
+            executor.submit(users.run_one, time.perf_counter())
+            arrival += 1
+
+
+async def run_async(browsers: int, journeys: list, recorder: Recorder, duration: float,
+                    rate: float = None, profile: str = "fast"):
+    """Closed or open load like run_closed/run_open, with every browser
+    driven from one trio event loop instead of a thread per browser
+
+    Returns the seconds spent generating load, browser start-up excluded.
+    """
+    users = itertools.cycle(load_users())
+    plan = itertools.cycle(journeys)
+    async with AsyncBrowsers(profile).open(browsers) as sessions:
+        free_send, free_receive = trio.open_memory_channel(browsers)
+        for session in sessions:
+            free_send.send_nowait(session)
+
+        async def run_one(arrived: float = None):
+            name, user = next(plan), next(users)
+            session = await free_receive.receive()
+            if arrived is not None:
+                recorder.steps.setdefault("queue_wait", []).append(
+                    (time.perf_counter() - arrived) * 1000)
+            try:
+                await session.delete_all_cookies()
+                with contextlib.suppress(WebDriverException):
+                    await session.execute_script("window.localStorage.clear();")
+                await ASYNC_JOURNEYS[name](session, user, recorder)
+                recorder.journey(name, True)
+            except Exception:
+                recorder.journey(name, False)
+            finally:
+                free_send.send_nowait(session)
+
+        started = time.monotonic()
+        async with trio.open_nursery() as nursery:
+            if rate:
+                arrival = 0
+                while arrival / rate < duration:
+                    await trio.sleep(max(0, started + arrival / rate - time.monotonic()))
+                    nursery.start_soon(run_one, time.perf_counter())
+                    arrival += 1
+            else:
+                async def loop():
+                    while time.monotonic() - started < duration:
+                        await run_one()
+
+                for _ in range(browsers):
+                    nursery.start_soon(loop)
+        return time.monotonic() - started
+
+
+def build_report(recorder: Recorder, elapsed: float) -> dict:
+    completed = sum(counts["ok"] for counts in recorder.journeys.values())
+    failed = sum(counts["failed"] for counts in recorder.journeys.values())
+    steps = {}
+    for name in sorted(set(recorder.steps) | set(recorder.errors)):
+        samples = recorder.steps.get(name, [])
+        errors = recorder.errors.get(name, 0)
+        steps[name] = {
+            **describe(samples),
+            "errors": errors,
+            "error_rate": errors / (len(samples) + errors),
+        }
+    return {
+        "elapsed_s": elapsed,
+        "journeys": recorder.journeys,
+        "throughput_per_s": completed / elapsed if elapsed else 0,
+        "error_rate": failed / (completed + failed) if completed + failed else 0,
+        "steps_ms": steps,
+    }
+
+
+def print_report(report: dict, stream=sys.stdout):
+    stream.write(
+        f"Throughput: {report['throughput_per_s']:.2f} journeys/s over {report['elapsed_s']:.1f}s, "
+        f"error rate {report['error_rate']:.1%}\n")
+    for name, counts in report["journeys"].items():
+        stream.write(f"  {name}: {counts['ok']} ok, {counts['failed']} failed\n")
+    stream.write(f"\n{'step':<24}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>8}\n")
+    for name, step in report["steps_ms"].items():
+        stream.write(
+            f"{name:<24}{step['count']:>6}{step['p50']:>10.1f}{step['p95']:>10.1f}"
+            f"{step['p99']:>10.1f}{step['errors']:>8}\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Drive the app with concurrent synthetic users in headless Chrome")
+    parser.add_argument("-c", "--concurrency", type=int, default=4,
+                        help="number of browsers (virtual users) running at once")
+    parser.add_argument("-r", "--rate", type=float,
+                        help="journeys started per second; without it every "
+                             "browser runs journeys back to back")
+    parser.add_argument("-d", "--duration", type=float, default=60,
+                        help="seconds to generate load for")
+    parser.add_argument("-j", "--journey", action="append", choices=sorted(JOURNEYS),
+                        help="journey to run, may be repeated (default: all)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast",
+                        help="browser profile of the virtual users (default: fast)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="drive every browser from one event loop instead of a thread each")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    recorder = Recorder()
+    if args.use_async:
+        elapsed = trio.run(run_async, args.concurrency, args.journey or list(JOURNEYS),
+                           recorder, args.duration, args.rate, args.profile)
+        return finish(recorder, elapsed, args.json_path)
+
+    users = VirtualUsers(args.concurrency, args.journey or list(JOURNEYS), recorder,
+                         profile=args.profile)
+    users.start()
+    try:
+        started = time.monotonic()
+        if args.rate:
+            run_open(users, args.duration, args.rate)
+        else:
+            run_closed(users, args.duration)
+        elapsed = time.monotonic() - started
+    finally:
+        users.stop()
+    return finish(recorder, elapsed, args.json_path)
+
+
+def finish(recorder: Recorder, elapsed: float, json_path: str = None) -> int:
+    report = build_report(recorder, elapsed)
+    print_report(report)
+    if json_path:
+        with open(json_path, "w") as fp:
+            json.dump(report, fp, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import json
+import math
+import os
+import sys
+import unittest
+
+if __name__ == "__main__" and "--update" in sys.argv:
+    # Budgets are measured on the production build; config starts serving it
+    os.environ.setdefault("SVQ_SERVE_DIST", "1")
+
+import config
+from auth import DEFAULT_USER, auth_storage
+from base import SeleniumTestCase
+from driver_pool import get_pool
+from static_server import bundle_size, ensure_build
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "budgets.json")
+
+# Headroom applied on top of measured values by --update
+UPDATE_HEADROOM = 1.25
+
+# Bundle bytes do not vary between runs, so they get far less room
+BUNDLE_HEADROOM = 1.05
+
+# Waits for the load event and the first contentful paint, then reads the
+# Resource Timing entries of the page
+COLLECT_SCRIPT = """
+const done = arguments[arguments.length - 1];
+
+function collect(fcp) {
+    const resources = performance.getEntriesByType("resource");
+    const scripts = resources.filter((entry) =>
+        entry.initiatorType === "script" || /\\.(m?js|jsx|tsx?)(\\?|$)/.test(entry.name)
+    );
+    done({
+        first_contentful_paint_ms: fcp,
+        requests: resources.length + 1,
+        js_transfer_bytes: scripts.reduce((total, entry) => total + entry.transferSize, 0),
+    });
+}
+
+function whenPainted() {
+    const [paint] = performance.getEntriesByName("first-contentful-paint");
+    if (paint) {
+        return collect(paint.startTime);
+    }
+    const observer = new PerformanceObserver((list) => {
+        const entry = list.getEntriesByName("first-contentful-paint")[0];
+        if (entry) {
+            observer.disconnect();
+            collect(entry.startTime);
+        }
+    });
+    observer.observe({ type: "paint", buffered: true });
+    setTimeout(() => {
+        observer.disconnect();
+        collect(null);
+    }, 10000);
+}
+
+if (document.readyState === "complete") {
+    whenPainted();
+} else {
+    window.addEventListener("load", whenPainted, { once: true });
+}
+"""
+
+ROUTES = ["/", "/dashboard", "/ai-survey", "/create-survey"]
+
+
+def script_duration(driver) -> float:
+    metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+    return next(metric["value"] for metric in metrics if metric["name"] == "ScriptDuration")
+
+
+def measure_route(driver, path: str) -> dict:
+    """Cold-cache performance numbers of one route, through CDP"""
+    driver.execute_cdp_cmd("Performance.enable", {})
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+    try:
+        before = script_duration(driver)
+        driver.get(config.url(path))
+        driver.set_script_timeout(30)
+        measured = driver.execute_async_script(COLLECT_SCRIPT)
+        after = script_duration(driver)
+    finally:
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+        driver.execute_cdp_cmd("Network.disable", {})
+        driver.execute_cdp_cmd("Performance.disable", {})
+    # A cross-process navigation starts a new renderer with fresh counters
+    measured["script_duration_ms"] = ((after - before) if after >= before else after) * 1000
+    return measured
+
+
+def load_budgets(path: str = BUDGETS_PATH) -> dict:
+    """{"bundle": {metric: limit}, "routes": {path: {metric: limit}}}"""
+    try:
+        with open(path) as fp:
+            budgets = json.load(fp)
+    except FileNotFoundError:
+        budgets = {}
+    budgets.setdefault("bundle", {})
+    budgets.setdefault("routes", {})
+    return budgets
+
+
+def save_budgets(budgets: dict, path: str = BUDGETS_PATH):
+    with open(path, "w") as fp:
+        json.dump(budgets, fp, indent=2)
+        fp.write("\n")
+
+
+def over_budget(measured: dict, budget: dict) -> list:
+    """Lines describing every metric that exceeds its budget"""
+    lines = []
+    for metric, limit in budget.items():
+        value = measured.get(metric)
+        if value is None:
+            lines.append(f"  {metric}: not measured (budget {limit})")
+        elif value > limit:
+            lines.append(
+                f"  {metric}: {value:.0f} > budget {limit} (+{(value - limit) / limit:.0%})")
+    return lines
+
+
+class PageBudgetTest(SeleniumTestCase):
+    """Fails when a route gets slower or heavier than budgets.json allows"""
+
+    login_user = DEFAULT_USER
+
+    @classmethod
+    def setUpClass(cls):
+        if not os.environ.get("SVQ_SERVE_DIST"):
+            # The dev server's unbundled modules say nothing about what ships
+            raise unittest.SkipTest("budgets apply to the production build, run with --serve-dist")
+        cls.budgets = load_budgets()
+
+    def check_route(self, path: str):
+        budget = self.budgets["routes"].get(path)
+        if not budget:
+            self.fail(f"no budget for {path} in budgets.json, run python page_budgets.py --update")
+        measured = measure_route(self.driver, path)
+        problems = over_budget(measured, budget)
+        if problems:
+            self.fail(f"{path} is over its performance budget:\n" + "\n".join(problems))
+
+    def test_login_page_budget(self):
+        self.check_route("/")
+
+    def test_dashboard_budget(self):
+        self.check_route("/dashboard")
+
+    def test_ai_survey_budget(self):
+        self.check_route("/ai-survey")
+
+    def test_create_survey_budget(self):
+        self.check_route("/create-survey")
+
+
+class BundleBudgetTest(unittest.TestCase):
+    """Fails when the production build ships more JS than budgets.json allows
+
+    Every route loads the same bundle, so this is their JS transfer size
+    (the static server does not compress). Needs the build, not Chrome.
+    """
+
+    def test_bundle_budget(self):
+        budget = load_budgets()["bundle"]
+        if not budget:
+            self.fail("no bundle budget in budgets.json, run python page_budgets.py --update-bundle")
+        problems = over_budget(bundle_size(ensure_build()), budget)
+        if problems:
+            self.fail("the production bundle is over its budget:\n" + "\n".join(problems))
+
+
+def update_bundle_budget(budgets: dict):
+    """Store the current build's JS size plus headroom as the bundle budget"""
+    budgets["bundle"] = {
+        metric: math.ceil(value * BUNDLE_HEADROOM)
+        for metric, value in bundle_size(ensure_build()).items()
+    }
+    print(f"bundle: {budgets['bundle']}")
+
+
+def update_route_budgets(budgets: dict):
+    """Re-measure every route and store the results plus headroom as budgets"""
+    pool = get_pool()
+    driver = pool.acquire(config.url("/"), local_storage=auth_storage(*DEFAULT_USER))
+    try:
+        for route in ROUTES:
+            measured = measure_route(driver, route)
+            budgets["routes"][route] = {
+                metric: math.ceil(value * UPDATE_HEADROOM)
+                for metric, value in measured.items() if value is not None
+            }
+            print(f"{route}: {budgets['routes'][route]}")
+    finally:
+        pool.release(driver)
+
+
+if __name__ == "__main__":
+    if "--update" in sys.argv or "--update-bundle" in sys.argv:
+        budgets = load_budgets()
+        update_bundle_budget(budgets)
+        if "--update" in sys.argv:
+            update_route_budgets(budgets)
+        save_budgets(budgets)
+    else:
+        unittest.main()
@@ -0,0 +1,68 @@
+# Prepended to in-page benchmark scripts. measure() times from just before an
+# interaction until the awaited DOM state is committed, and until the next
+# frame has been produced after it. Long tasks overlapping it are counted.
+MEASURE_PRELUDE = """
+const done = arguments[arguments.length - 1];
+
+function setValue(element, value) {
+    const prototype = Object.getPrototypeOf(element);
+    Object.getOwnPropertyDescriptor(prototype, "value").set.call(element, value);
+    element.dispatchEvent(new Event("input", { bubbles: true }));
+}
+
+function byId(id) {
+    return document.getElementById(id);
+}
+
+function measure(interact, settled, timeout) {
+    const longTasks = [];
+    const taskObserver = new PerformanceObserver((list) => longTasks.push(...list.getEntries()));
+    taskObserver.observe({ type: "longtask" });
+
+    let finished = false;
+    const started = performance.now();
+    const observer = new MutationObserver(check);
+
+    function finish(result) {
+        finished = true;
+        observer.disconnect();
+        clearTimeout(timer);
+        // Long task entries are delivered asynchronously, give them a tick
+        setTimeout(() => {
+            taskObserver.disconnect();
+            const overlapping = longTasks.filter(
+                (task) => task.startTime + task.duration >= started
+            );
+            result.long_tasks = overlapping.length;
+            result.long_task_ms = overlapping.reduce((total, task) => total + task.duration, 0);
+            done(result);
+        }, 0);
+    }
+
+    function check() {
+        if (finished || !settled()) {
+            return;
+        }
+        const committed = performance.now();
+        observer.disconnect();
+        requestAnimationFrame(() => setTimeout(() => {
+            finish({
+                commit_ms: committed - started,
+                paint_ms: performance.now() - started,
+            });
+        }, 0));
+        finished = true;
+    }
+
+    const timer = setTimeout(() => {
+        if (!finished) {
+            finish({ commit_ms: null, paint_ms: null });
+        }
+    }, timeout);
+
+    observer.observe(document, { childList: true, subtree: true, attributes: true, characterData: true });
+    performance.mark("svq-interaction-start");
+    interact();
+    check();
+}
+"""
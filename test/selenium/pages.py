@@ -0,0 +1,184 @@
+from typing import Literal
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webelement import WebElement
+
+import config
+from dom_snapshot import by_testid
+from waits import EventWait, PageCondition
+
+# Commands after which no element of the previous document is usable
+NAVIGATION_COMMANDS = {Command.GET, Command.REFRESH, Command.GO_BACK, Command.GO_FORWARD}
+
+Models = Literal["chatgpt"] | Literal["claude"] | Literal["copilot"] | Literal["bard"]
+
+
+def watch_navigation(driver):
+    """Count the navigations the driver is told to make
+
+    Pooled drivers outlive the pages built on them, so the counter lives on
+    the driver and is only installed once.
+    """
+    if hasattr(driver, "_svq_navigations"):
+        return driver
+    execute = driver.execute
+    driver._svq_navigations = 0
+
+    def counting_execute(driver_command, params=None):
+        if driver_command in NAVIGATION_COMMANDS:
+            driver._svq_navigations += 1
+        return execute(driver_command, params)
+
+    driver.execute = counting_execute
+    return driver
+
+
+class CachedElement(WebElement):
+    """An element a page has resolved, found again if it goes stale
+
+    React replaces nodes on re-render and client side route changes, which
+    selenium only notices when the old node is used; the command is then
+    retried once on the node the locator resolves to now.
+    """
+
+    def __init__(self, page: "Page", key: tuple, element: WebElement):
+        super().__init__(element.parent, element.id)
+        self._page = page
+        self._key = key
+
+    def _execute(self, command, params=None):
+        try:
+            return super()._execute(command, params)
+        except StaleElementReferenceException:
+            self._page._relocate(self)
+            return super()._execute(command, params)
+
+
+class Locator:
+    """Page attribute that resolves to a cached element
+
+    condition is one of the EventWait kinds (present, visible, clickable) and
+    is checked when the element is resolved, not on every access.
+    """
+
+    def __init__(self, by: str, value: str, condition: str = "present"):
+        self.by = by
+        self.value = value
+        self.condition = condition
+
+    def __get__(self, page, owner=None):
+        if page is None:
+            return self
+        return page.element(self.by, self.value, self.condition)
+
+
+class Page:
+    """Elements of one page, looked up once per document
+
+    A cached element is dropped when the driver navigates, and re-resolved in
+    place when it turns out to be stale.
+    """
+
+    path = "/"
+    timeout = 10
+
+    def __init__(self, driver, timeout: float = None):
+        self.driver = watch_navigation(driver)
+        if timeout is not None:
+            self.timeout = timeout
+        self._cache = {}
+
+    def open(self):
+        self.driver.get(config.url(self.path))
+        return self
+
+    def element(self, by: str, value: str, condition: str = "present") -> CachedElement:
+        key = (condition, by, value)
+        cached = self._cache.get(key)
+        if cached and cached[0] == self.driver._svq_navigations:
+            return cached[1]
+        element = CachedElement(self, key, self._locate(key))
+        self._cache[key] = (self.driver._svq_navigations, element)
+        return element
+
+    def by_id(self, element_id: str, condition: str = "present") -> CachedElement:
+        return self.element(By.ID, element_id, condition)
+
+    def by_testid(self, testid: str, condition: str = "present") -> CachedElement:
+        return self.element(By.CSS_SELECTOR, by_testid(testid), condition)
+
+    def invalidate(self):
+        self._cache.clear()
+
+    def _locate(self, key: tuple) -> WebElement:
+        return EventWait(self.driver, self.timeout).until(PageCondition(*key))
+
+    def _relocate(self, element: CachedElement):
+        element._id = self._locate(element._key).id
+        self._cache[element._key] = (self.driver._svq_navigations, element)
+
+
+class LoginPage(Page):
+
+    path = "/"
+
+    email = Locator(By.ID, "login-form__field:email")
+    password = Locator(By.ID, "login-form__field:password")
+    submit = Locator(By.ID, "login-form__action:submit", "clickable")
+    email_error = Locator(By.ID, "login-form__error:email")
+    password_error = Locator(By.ID, "login-form__error:password")
+    unauthorized_error = Locator(By.ID, "login-form__error:unauthorized")
+
+    def sign_in(self, email: str, password: str):
+        self.email.send_keys(email)
+        self.password.send_keys(password)
+        self.submit.click()
+
+
+class DashboardPage(Page):
+
+    path = "/dashboard"
+
+    to_ai_survey = Locator(By.ID, "dashboard__action:to-ai-survey", "clickable")
+    to_create_survey = Locator(By.ID, "dashboard__action:to-create-survey", "clickable")
+    logout = Locator(By.ID, "dashboard__action:logout")
+
+
+class AiSurveyPage(Page):
+
+    path = "/ai-survey"
+
+    full_name = Locator(By.ID, "ai-survey__field:full-name", "clickable")
+    birthdate = Locator(By.ID, "ai-survey__field:birthdate", "clickable")
+    submit = Locator(By.ID, "aisurvey-form__action:submit", "clickable")
+    reset = Locator(By.ID, "aisurvey-form__action:reset", "clickable")
+    full_name_error = Locator(By.ID, "ai-survey__error:full-name")
+    birthdate_error = Locator(By.ID, "ai-survey__error:birthdate")
+
+    def model_checkbox(self, model: Models) -> CachedElement:
+        return self.by_id(f"ai-survey__field:model-{model}", "clickable")
+
+    def model_defect(self, model: Models) -> CachedElement:
+        return self.by_id(f"ai-survey__field:modeldefect-{model}", "clickable")
+
+    def model_defect_error(self, model: Models) -> CachedElement:
+        return self.by_id(f"ai-survey__error:modeldefect-{model}", "clickable")
+
+    def scroll_into_view(self, element_id: str):
+        """Scroll the form (the scrolling container) so the element is at its top"""
+        self.driver.execute_script(
+            "const container = document.getElementById('ai-survey__form');"
+            "container.scrollTop = document.getElementById(arguments[0]).offsetTop"
+            " - container.offsetTop;",
+            element_id)
+
+
+class CreateSurveyPage(Page):
+
+    path = "/create-survey"
+    timeout = 15
+
+    title = Locator(By.CSS_SELECTOR, by_testid("survey-title-input"))
+    save = Locator(By.CSS_SELECTOR, by_testid("save-survey-button"), "clickable")
+    back = Locator(By.CSS_SELECTOR, by_testid("back-to-dashboard-button"), "clickable")
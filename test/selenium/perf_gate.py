@@ -0,0 +1,191 @@
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import sys
+from selenium.webdriver.common.by import By
+
+import config
+from auth import DEFAULT_USER
+from bench_survey_editor import ADD_SCRIPT, QUESTION_TYPES, TIMEOUT_MS
+from driver_pool import get_pool
+from load import Recorder, journey_ai_survey, journey_login
+from profiles import current_profile
+from stats import bootstrap_ratio, describe, mann_whitney
+from waits import EventWait, element_to_be_clickable
+
+BASELINE_PATH = os.environ.get(
+    "SVQ_PERF_BASELINE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_baseline.json"))
+
+DEFAULT_RUNS = 15
+# Runs discarded before measuring, they pay for cold caches and JIT
+WARMUP_RUNS = 1
+
+# A step fails the gate only when the slowdown is significant at ALPHA and
+# the bootstrap interval of the median ratio clears MIN_SLOWDOWN
+ALPHA = 0.01
+MIN_SLOWDOWN = 0.05
+
+
+def flow_editor_add_question(driver, user, recorder: Recorder):
+    with recorder.step("editor.open"):
+        driver.get(config.url("/create-survey"))
+        EventWait(driver, 15).until(element_to_be_clickable(
+            (By.CSS_SELECTOR, "[data-testid='add-question-openEnded-button']")))
+    driver.set_script_timeout(TIMEOUT_MS / 1000 + 5)
+    for question_type in QUESTION_TYPES:
+        with recorder.step(f"editor.add_{question_type}"):
+            driver.execute_async_script(ADD_SCRIPT, question_type, TIMEOUT_MS)
+
+
+# LoginTest.test_successful_login, the AI survey submit path and the survey
+# editor add-question path, timed step by step
+FLOWS = {
+    "login": journey_login,
+    "ai_survey_submit": journey_ai_survey,
+    "editor_add_question": flow_editor_add_question,
+}
+
+
+def measure(flows: list, runs: int) -> dict:
+    """{flow: {step: [ms, ...]}} over runs repetitions of each flow"""
+    pool = get_pool()
+    samples = {}
+    for name in flows:
+        recorder = Recorder()
+        for run in range(WARMUP_RUNS + runs):
+            if run == WARMUP_RUNS:
+                recorder = Recorder()
+            driver = pool.acquire(config.url("/"))
+            try:
+                FLOWS[name](driver, DEFAULT_USER, recorder)
+            finally:
+                pool.release(driver)
+        samples[name] = recorder.steps
+    return samples
+
+
+class BaselineStore:
+    """Baseline samples in a JSON file (kept in the repo) or a SQLite database"""
+
+    def __init__(self, path: str = BASELINE_PATH):
+        self.path = path
+        self.sqlite = path.endswith((".sqlite3", ".db"))
+
+    def load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        if not self.sqlite:
+            with open(self.path) as fp:
+                return json.load(fp)["flows"]
+        flows = {}
+        with sqlite3.connect(self.path) as connection:
+            for flow, step, ms in connection.execute("SELECT flow, step, ms FROM samples"):
+                flows.setdefault(flow, {}).setdefault(step, []).append(ms)
+        return flows
+
+    def save(self, flows: dict):
+        """Replace the baseline of the given flows, keeping the others"""
+        merged = {**self.load(), **flows}
+        if not self.sqlite:
+            with open(self.path, "w") as fp:
+                json.dump({
+                    "recorded_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "profile": current_profile(),
+                    "base_url": config.BASE_URL,
+                    "flows": merged,
+                }, fp, indent=2)
+            return
+        with sqlite3.connect(self.path) as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS samples (flow TEXT, step TEXT, ms REAL)")
+            connection.execute("DELETE FROM samples")
+            connection.executemany(
+                "INSERT INTO samples (flow, step, ms) VALUES (?, ?, ?)",
+                [(flow, step, ms) for flow, steps in merged.items()
+                 for step, values in steps.items() for ms in values])
+
+
+def compare(baseline: dict, current: dict) -> list:
+    rows = []
+    for flow, steps in current.items():
+        for step, samples in steps.items():
+            row = {"flow": flow, "step": step, "current_p50": describe(samples)["p50"]}
+            reference = baseline.get(flow, {}).get(step)
+            if not reference:
+                rows.append({**row, "verdict": "new"})
+                continue
+            test = mann_whitney(reference, samples)
+            ratio = bootstrap_ratio(reference, samples)
+            slower = test["p"] < ALPHA and ratio["low"] > 1 + MIN_SLOWDOWN
+            rows.append({
+                **row,
+                "baseline_p50": describe(reference)["p50"],
+                "ratio": ratio["ratio"],
+                "ratio_low": ratio["low"],
+                "ratio_high": ratio["high"],
+                "cliffs_delta": test["cliffs_delta"],
+                "p": test["p"],
+                "verdict": "slower" if slower else "ok",
+            })
+    return rows
+
+
+def print_rows(rows: list, stream=sys.stdout):
+    stream.write(f"{'step':<34}{'base p50':>10}{'now p50':>10}{'ratio':>8}"
+                 f"{'95% CI':>16}{'delta':>8}{'p':>9}  verdict\n")
+    for row in rows:
+        name = f"{row['flow']}/{row['step']}"
+        if row["verdict"] == "new":
+            stream.write(f"{name:<34}{'-':>10}{row['current_p50']:>10.1f}{'':>41}  new\n")
+            continue
+        interval = f"{row['ratio_low']:.2f}-{row['ratio_high']:.2f}"
+        stream.write(
+            f"{name:<34}{row['baseline_p50']:>10.1f}{row['current_p50']:>10.1f}"
+            f"{row['ratio']:>8.2f}{interval:>16}{row['cliffs_delta']:>8.2f}"
+            f"{row['p']:>9.4f}  {row['verdict']}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fail on statistically significant slowdowns of key flows against a baseline")
+    parser.add_argument("command", choices=["check", "update"],
+                        help="check against the baseline, or record a new one after an intended change")
+    parser.add_argument("-n", "--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("-f", "--flow", action="append", choices=sorted(FLOWS),
+                        help="flow to run, may be repeated (default: all)")
+    parser.add_argument("--baseline", default=BASELINE_PATH,
+                        help="JSON file, or a .sqlite3/.db database (default: %(default)s)")
+    parser.add_argument("--json", dest="json_path", help="also write the comparison to this file")
+    args = parser.parse_args(argv)
+
+    store = BaselineStore(args.baseline)
+    flows = args.flow or list(FLOWS)
+    baseline = store.load()
+    if args.command == "check" and not all(flow in baseline for flow in flows):
+        print(f"No baseline for every flow in {args.baseline}, "
+              f"record one with: python perf_gate.py update", file=sys.stderr)
+        return 2
+
+    current = measure(flows, args.runs)
+    if args.command == "update":
+        store.save(current)
+        print(f"Baseline of {', '.join(flows)} saved to {args.baseline}")
+        return 0
+
+    rows = compare(baseline, current)
+    print_rows(rows)
+    if args.json_path:
+        with open(args.json_path, "w") as fp:
+            json.dump(rows, fp, indent=2)
+    slower = [row for row in rows if row["verdict"] == "slower"]
+    if slower:
+        print(f"Significantly slower: {', '.join(row['flow'] + '/' + row['step'] for row in slower)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
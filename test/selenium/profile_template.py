@@ -0,0 +1,154 @@
+import multiprocessing.util
+import os
+import shutil
+import subprocess
+import tempfile
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service as ChromeService
+
+import config
+from auth import DEFAULT_USER, auth_storage
+
+# Pages whose scripts and styles end up in the template's HTTP and code caches
+WARM_ROUTES = ["/", "/dashboard", "/ai-survey", "/create-survey"]
+
+# App state and per-instance files that must not carry over into the copies
+STATEFUL_PATHS = [
+    "SingletonLock",
+    "SingletonSocket",
+    "SingletonCookie",
+    os.path.join("Default", "Local Storage"),
+    os.path.join("Default", "Session Storage"),
+    os.path.join("Default", "IndexedDB"),
+    os.path.join("Default", "Cookies"),
+    os.path.join("Default", "Cookies-journal"),
+]
+
+# Copies go to RAM when they cannot share blocks with the template
+TMPFS_DIR = "/dev/shm"
+
+_copies = set()
+_copies_pid = None
+_reflink = None
+
+
+def build(options) -> str:
+    """A user-data-dir that has been through first run and has the app cached"""
+    from driver_pool import ORIGIN, RESET_SCRIPT
+
+    directory = tempfile.mkdtemp(prefix="svq-template-")
+    options.add_argument(f"--user-data-dir={directory}")
+    driver = webdriver.Chrome(service=ChromeService(), options=options)
+    try:
+        driver.get(config.BASE_URL)
+        driver.execute_script(RESET_SCRIPT, ORIGIN, auth_storage(*DEFAULT_USER))
+        for path in WARM_ROUTES:
+            driver.get(config.url(path))
+        driver.execute_script(RESET_SCRIPT, ORIGIN, {})
+    finally:
+        # Quitting flushes the caches to disk
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+    for path in STATEFUL_PATHS:
+        path = os.path.join(directory, path)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.lexists(path):
+            os.remove(path)
+    return directory
+
+
+def template_dir(options) -> str:
+    """The run's template, built by the first process that asks for it
+
+    The path goes into the environment so worker processes started
+    afterwards reuse it; the builder removes it when it exits.
+    """
+    directory = os.environ.get("SVQ_PROFILE_TEMPLATE_DIR")
+    if directory and os.path.isdir(directory):
+        return directory
+    directory = build(options)
+    os.environ["SVQ_PROFILE_TEMPLATE_DIR"] = directory
+    multiprocessing.util.Finalize(
+        None, shutil.rmtree, args=(directory, True), exitpriority=1)
+    return directory
+
+
+def clone(template: str) -> str:
+    """A private copy of the template for one browser session
+
+    Reflinks share the template's blocks until Chrome writes to them (btrfs,
+    xfs). Elsewhere the template is copied into tmpfs. Hardlinks are not used
+    because Chrome rewrites cache and database files in place, which would
+    leak one session's writes into every other copy.
+    """
+    global _reflink
+    if _reflink is not False:
+        target = tempfile.mkdtemp(prefix="svq-profile-", dir=os.path.dirname(template))
+        os.rmdir(target)
+        copied = subprocess.run(
+            ["cp", "-a", "--reflink=always", template, target],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+        if copied:
+            _reflink = True
+            return _track(target)
+        shutil.rmtree(target, ignore_errors=True)
+        _reflink = False
+
+    parent = TMPFS_DIR if os.path.isdir(TMPFS_DIR) else None
+    target = tempfile.mkdtemp(prefix="svq-profile-", dir=parent)
+    shutil.copytree(template, target, symlinks=True, dirs_exist_ok=True)
+    return _track(target)
+
+
+def _track(directory: str) -> str:
+    global _copies, _copies_pid
+    if _copies_pid != os.getpid():
+        # A forked worker inherits the parent's copies but not its finalizers
+        # (multiprocessing clears them in the child); it removes its own
+        _copies = set()
+        _copies_pid = os.getpid()
+        multiprocessing.util.Finalize(None, _remove_all, exitpriority=1)
+    _copies.add(directory)
+    return directory
+
+
+def remove(directory: str):
+    if directory in _copies:
+        _copies.discard(directory)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _remove_all():
+    """Copies of sessions still open when the process exits"""
+    for directory in list(_copies):
+        remove(directory)
+
+
+def launch(options, new_options):
+    """Start Chrome on a fresh copy of the template, removed when the driver quits
+
+    new_options builds the options the template itself is made with.
+    """
+    copy = clone(template_dir(new_options()))
+    options.add_argument(f"--user-data-dir={copy}")
+    try:
+        driver = webdriver.Chrome(service=ChromeService(), options=options)
+    except BaseException:
+        remove(copy)
+        raise
+    quit = driver.quit
+
+    def quit_and_remove():
+        try:
+            quit()
+        finally:
+            remove(copy)
+
+    # Pooled drivers stay referenced until the worker exits, so waiting for
+    # the driver to be collected would keep every copy around until then
+    driver.quit = quit_and_remove
+    return driver
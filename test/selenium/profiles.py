@@ -0,0 +1,111 @@
+import argparse
+import os
+import sys
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+from stats import describe
+
+PROFILES = {
+    # A visible browser with full page loads and survey_editor's old flags.
+    # The login and AI survey suites used to launch with bare ChromeOptions;
+    # one pool now serves every suite, so they get these flags as well
+    "default": {
+        "arguments": [
+            "--disable-extensions",
+            "--disable-gpu",
+            "--window-size=1920,1080",
+        ],
+        "page_load_strategy": "normal",
+        "prefs": {},
+    },
+    # Headless and stripped down for CI and load runs
+    "fast": {
+        "arguments": [
+            "--headless=new",
+            "--window-size=1920,1080",
+            "--disable-extensions",
+            "--disable-gpu",
+            "--disable-background-timer-throttling",
+            "--disable-backgrounding-occluded-windows",
+            "--disable-renderer-backgrounding",
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--mute-audio",
+            "--blink-settings=imagesEnabled=false",
+        ],
+        "page_load_strategy": "eager",
+        "prefs": {"profile.managed_default_content_settings.images": 2},
+    },
+}
+
+
+def current_profile() -> str:
+    """Profile picked for this run through SVQ_PROFILE (or runner --profile)"""
+    name = os.environ.get("SVQ_PROFILE", "default")
+    if name not in PROFILES:
+        raise ValueError(f"Unknown SVQ_PROFILE {name!r}, expected one of {sorted(PROFILES)}")
+    return name
+
+
+def chrome_options(name: str = None) -> ChromeOptions:
+    profile = PROFILES[name or current_profile()]
+    options = ChromeOptions()
+    for argument in profile["arguments"]:
+        options.add_argument(argument)
+    options.page_load_strategy = profile["page_load_strategy"]
+    if profile["prefs"]:
+        options.add_experimental_option("prefs", profile["prefs"])
+    return options
+
+
+def new_chrome(name: str = None):
+    """Launch a fresh Chrome session with the given (or current) profile
+
+    With SVQ_PROFILE_TEMPLATE set, the session starts on a private copy of a
+    user-data-dir that was warmed up once for the whole run.
+    """
+    if os.environ.get("SVQ_PROFILE_TEMPLATE"):
+        import profile_template
+        return profile_template.launch(chrome_options(name), lambda: chrome_options(name))
+    return webdriver.Chrome(service=ChromeService(), options=chrome_options(name))
+
+
+def measure_startup(name: str, launches: int) -> list:
+    """Seconds from launch until a session is ready, per launch"""
+    timings = []
+    for _ in range(launches):
+        started = time.perf_counter()
+        driver = new_chrome(name)
+        timings.append(time.perf_counter() - started)
+        driver.quit()
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure browser start-up time of each browser profile")
+    parser.add_argument("-n", "--launches", type=int, default=5)
+    parser.add_argument("-p", "--profile", action="append", choices=sorted(PROFILES),
+                        help="profile to measure, may be repeated (default: all)")
+    parser.add_argument("--template", action="store_true",
+                        help="launch on copies of a warmed user-data-dir template")
+    args = parser.parse_args(argv)
+    if args.template:
+        os.environ["SVQ_PROFILE_TEMPLATE"] = "1"
+
+    for name in args.profile or PROFILES:
+        stats = describe([seconds * 1000 for seconds in measure_startup(name, args.launches)])
+        print(f"{name:<10} start-up over {stats['count']} launches: "
+              f"mean {stats['mean']:.0f} ms, p50 {stats['p50']:.0f} ms, max {stats['max']:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
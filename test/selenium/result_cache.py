@@ -0,0 +1,224 @@
+import ast
+import hashlib
+import inspect
+import json
+import os
+import re
+import sys
+import unittest
+
+from profiles import current_profile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(HERE, "..", ".."))
+PAGES_DIR = os.path.join(REPO_ROOT, "src", "pages")
+CACHE_PATH = os.path.join(HERE, ".svq-cache", "results.json")
+
+# Page objects; their Locators hold the element ids of the tests that use them
+PAGE_OBJECTS = os.path.join(HERE, "pages.py")
+PAGE_CLASS_PATTERN = re.compile(r"^class (\w+)\(Page\):\n(?:(?:[ \t].*)?\n)*", re.MULTILINE)
+
+# Front-end files outside src/pages that every page is built from
+SHARED_FRONTEND = ["index.html", "package-lock.json", "vite.config.ts"]
+
+# Element ids and data-testid fragments such as "login-form__field:email" or
+# "question-" out of "question-{q_id}-title-input"
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_:.-]*[_:-][A-Za-z0-9_:.-]*")
+ROUTE_PATTERN = re.compile(r"""["'](/[A-Za-z0-9/_-]*)["']""")
+IGNORED_TOKENS = {"data-testid"}
+MIN_TOKEN_LENGTH = 6
+
+
+def _hash_files(paths) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, REPO_ROOT).encode())
+        with open(path, "rb") as fp:
+            digest.update(hashlib.sha256(fp.read()).digest())
+    return digest.hexdigest()
+
+
+def _walk(directory: str):
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file in sorted(files):
+            yield os.path.join(root, file)
+
+
+def local_imports(path: str) -> set:
+    """Files of the modules next to this one that path imports, at any depth
+
+    Read from the syntax tree, so imports made inside functions (config
+    starting static_server, profiles loading profile_template) count too.
+    """
+    seen = set()
+    pending = [path]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        with open(current) as fp:
+            tree = ast.parse(fp.read(), current)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = os.path.join(HERE, name.split(".")[0] + ".py")
+                if os.path.exists(module):
+                    pending.append(module)
+    return seen
+
+
+def module_statements(path: str) -> str:
+    """Source of a module's top level outside its classes: constants, helpers"""
+    with open(path) as fp:
+        source = fp.read()
+    return "\n".join(ast.get_source_segment(source, node)
+                     for node in ast.parse(source, path).body
+                     if not isinstance(node, ast.ClassDef))
+
+
+def run_environment() -> dict:
+    """Settings outside the code that change what a test runs against"""
+    return {
+        "profile": current_profile(),
+        # The dist server's port changes every run, the build is hashed anyway
+        "app": "dist" if os.environ.get("SVQ_SERVE_DIST") else os.environ.get("SVQ_BASE_URL", ""),
+        "profile_template": bool(os.environ.get("SVQ_PROFILE_TEMPLATE")),
+    }
+
+
+def page_objects() -> dict:
+    """Page object class name -> its source, read from pages.py without importing it"""
+    with open(PAGE_OBJECTS) as fp:
+        source = fp.read()
+    return {match.group(1): match.group(0) for match in PAGE_CLASS_PATTERN.finditer(source)}
+
+
+def route_pages() -> dict:
+    """Route path -> page file, read from src/routes.tsx"""
+    with open(os.path.join(REPO_ROOT, "src", "routes.tsx")) as fp:
+        source = fp.read()
+    imports = {}
+    for names, module in re.findall(r'import\s+\{?\s*([\w\s,]+?)\s*\}?\s+from\s+"\./pages/([^"]+)"', source):
+        for name in names.split(","):
+            imports[name.strip()] = os.path.join(PAGES_DIR, f"{module}.tsx")
+    routes = {}
+    for path, component in re.findall(r'path="([^"]+)"\s+element=\{<(\w+)', source):
+        if component in imports:
+            routes[path] = imports[component]
+    index = re.search(r'path="(/[^"]*)"[^\n]*\n\s*<Route\s+index\s+element=\{<(\w+)', source)
+    if index and index.group(2) in imports:
+        routes[index.group(1)] = imports[index.group(2)]
+    return routes
+
+
+class ResultCache:
+    """Remembers passing tests keyed by their source and front-end dependencies
+
+    A test's key hashes its module and every harness module that imports
+    from, at any depth, the helper code of its class, the run environment and
+    the front-end files it depends on: the src/pages files that define the
+    element ids, data-testid values and routes the test, its class or its
+    module's top level refer to, plus every front-end file outside src/pages.
+    A test whose key has not changed since it last passed can be reported from
+    the cache.
+    """
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+        try:
+            with open(path) as fp:
+                self.entries = json.load(fp)
+        except FileNotFoundError:
+            self.entries = {}
+        self.pages = {}
+        for page in _walk(PAGES_DIR):
+            with open(page) as fp:
+                self.pages[page] = fp.read()
+        self.routes = route_pages()
+        self.page_objects = page_objects()
+        shared = [path for path in _walk(os.path.join(REPO_ROOT, "src"))
+                  if not path.startswith(PAGES_DIR + os.sep)]
+        shared += [os.path.join(REPO_ROOT, name) for name in SHARED_FRONTEND]
+        self.shared_hash = _hash_files(path for path in shared if os.path.exists(path))
+        self.environment = json.dumps(run_environment(), sort_keys=True)
+        self._code_hashes = {}
+        self._keys = {}
+
+    def code_hash(self, module_path: str) -> str:
+        """Hash of a test module and the harness modules it imports"""
+        if module_path not in self._code_hashes:
+            self._code_hashes[module_path] = _hash_files(local_imports(module_path))
+        return self._code_hashes[module_path]
+
+    def dependencies(self, source: str) -> list:
+        """Page files that define the ids, testids and routes used in source
+
+        Page objects named in source count with their Locators and path.
+        """
+        source += "".join(page for name, page in self.page_objects.items()
+                          if re.search(rf"\b{name}\b", source))
+        tokens = {token.strip(".:-") for literal in re.findall(r"([\"'])(.*?)\1", source)
+                  for token in TOKEN_PATTERN.findall(literal[1])}
+        tokens = {token for token in tokens
+                  if len(token) >= MIN_TOKEN_LENGTH and token not in IGNORED_TOKENS}
+        pages = {path for path, content in self.pages.items()
+                 if any(token in content for token in tokens)}
+        pages.update(self.routes[route] for route in ROUTE_PATTERN.findall(source)
+                     if route in self.routes)
+        return sorted(pages)
+
+    def key(self, test_id: str) -> str:
+        if test_id in self._keys:
+            return self._keys[test_id]
+        test = next(iter(unittest.TestLoader().loadTestsFromName(test_id)))
+        cls = type(test)
+        method = getattr(cls, test._testMethodName)
+
+        sources = [inspect.getsource(method)]
+        for klass in cls.__mro__:
+            if klass.__module__ in ("unittest.case", "builtins"):
+                continue
+            for name, member in vars(klass).items():
+                if name.startswith("test"):
+                    continue
+                if isinstance(member, (property, classmethod, staticmethod)) or inspect.isfunction(member):
+                    target = member.fget if isinstance(member, property) else member
+                    sources.append(inspect.getsource(target))
+                elif isinstance(member, str) and not name.startswith("__"):
+                    sources.append(f"{name} = {member!r}")
+        module_path = os.path.abspath(sys.modules[cls.__module__].__file__)
+        sources.append(module_statements(module_path))
+        source = "\n".join(sources)
+
+        digest = hashlib.sha256(source.encode())
+        digest.update(self.shared_hash.encode())
+        digest.update(self.code_hash(module_path).encode())
+        digest.update(self.environment.encode())
+        digest.update(_hash_files(self.dependencies(source)).encode())
+        self._keys[test_id] = digest.hexdigest()
+        return self._keys[test_id]
+
+    def lookup(self, test_id: str):
+        """The cached passing record of the test, if its key is unchanged"""
+        entry = self.entries.get(test_id)
+        if entry and entry["key"] == self.key(test_id):
+            return entry["record"]
+        return None
+
+    def store(self, record: dict):
+        if record["status"] == "ok":
+            self.entries[record["id"]] = {"key": self.key(record["id"]), "record": record}
+        else:
+            self.entries.pop(record["id"], None)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as fp:
+            json.dump(self.entries, fp, indent=2)
@@ -0,0 +1,269 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import unittest
+
+import instrumentation
+from profiles import PROFILES, chrome_options
+from result_cache import ResultCache
+from timing_history import TimingHistory, load_manifest, longest_first
+
+SUITE_MODULES = ["login", "ai_survey", "survey_editor"]
+
+# Only meaningful against the production build, so only run by default with
+# --serve-dist
+DIST_MODULES = ["page_budgets"]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+
+def iter_tests(suite):
+    """Flatten a (possibly nested) unittest suite into single test cases"""
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iter_tests(test)
+        else:
+            yield test
+
+
+def discover(modules=SUITE_MODULES):
+    """Return the ids of every TestCase method in the given suite modules"""
+    loader = unittest.TestLoader()
+    test_ids = []
+    for name in modules:
+        suite = loader.loadTestsFromName(name)
+        test_ids.extend(test.id() for test in iter_tests(suite))
+    return test_ids
+
+
+class RecordingResult(unittest.TestResult):
+    """Collect outcomes as plain dicts so they can cross process boundaries"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self._started = None
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started = time.perf_counter()
+
+    def _record(self, test, status, err=None, reason=None):
+        details = reason
+        if err is not None:
+            details = "".join(traceback.format_exception(*err))
+        self.records.append({
+            "id": test.id(),
+            "status": status,
+            "duration": time.perf_counter() - self._started,
+            "details": details,
+            "worker": os.getpid(),
+        })
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, "ok")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, "fail", err=err)
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        if self._started is None:
+            # setUpClass/setUpModule errors are reported without startTest
+            self._started = time.perf_counter()
+        self._record(test, "error", err=err)
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._record(test, "skip", reason=reason)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self._record(test, "ok", err=err)
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self._record(test, "fail", reason="unexpected success")
+
+
+def run_test(test_id):
+    """Run a single test inside a worker process and return its records"""
+    suite = unittest.TestLoader().loadTestsFromName(test_id)
+    result = RecordingResult()
+    suite.run(result)
+    return result.records
+
+
+def run_parallel(test_ids, workers):
+    """Spread the tests over worker processes and yield records as they finish
+
+    Workers pull one test at a time from a shared queue, so a slow test never
+    holds back a shard of quick ones. Each worker process stays alive for the
+    whole run and drives its own browser.
+    """
+    if workers <= 1:
+        for test_id in test_ids:
+            yield from run_test(test_id)
+        return
+
+    pool = multiprocessing.Pool(processes=workers)
+    try:
+        for records in pool.imap_unordered(run_test, test_ids, chunksize=1):
+            yield from records
+        # close + join (rather than terminate) lets workers quit their browsers
+        pool.close()
+        pool.join()
+    except BaseException:
+        pool.terminate()
+        raise
+
+
+STATUS_MARKS = {"ok": ".", "fail": "F", "error": "E", "skip": "s"}
+
+
+def report(records, elapsed, stream=sys.stderr):
+    """Write a single merged unittest-style report for all workers"""
+    for record in records:
+        if record["status"] in ("fail", "error"):
+            stream.write("=" * 70 + "\n")
+            stream.write(f"{record['status'].upper()}: {record['id']}\n")
+            stream.write("-" * 70 + "\n")
+            stream.write(f"{record['details']}\n")
+
+    counts = {status: 0 for status in STATUS_MARKS}
+    for record in records:
+        counts[record["status"]] += 1
+
+    ran = [record for record in records if not record.get("cached")]
+    workers = len({record["worker"] for record in ran})
+    stream.write("-" * 70 + "\n")
+    stream.write(
+        f"Ran {len(ran)} tests in {elapsed:.3f}s on {workers} worker(s)")
+    if len(ran) < len(records):
+        stream.write(f", {len(records) - len(ran)} from cache")
+    stream.write("\n\n")
+
+    summary = []
+    if counts["fail"]:
+        summary.append(f"failures={counts['fail']}")
+    if counts["error"]:
+        summary.append(f"errors={counts['error']}")
+    if counts["skip"]:
+        summary.append(f"skipped={counts['skip']}")
+
+    ok = not counts["fail"] and not counts["error"]
+    verdict = "OK" if ok else "FAILED"
+    stream.write(f"{verdict} ({', '.join(summary)})\n" if summary else f"{verdict}\n")
+    return ok
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the selenium suites in parallel worker processes")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: cpu count)")
+    parser.add_argument("-m", "--module", action="append", dest="modules",
+                        help="suite module to run, may be repeated (default: all, "
+                             "page_budgets only with --serve-dist)")
+    parser.add_argument("-k", dest="patterns", action="append",
+                        help="only run tests whose id contains this substring")
+    parser.add_argument("--profile", choices=sorted(PROFILES),
+                        help="browser profile for all suites (default: $SVQ_PROFILE or default)")
+    parser.add_argument("--serve-dist", action="store_true",
+                        help="test a production build served locally instead of "
+                             "the dev server (rebuilt only when the sources change)")
+    parser.add_argument("--profile-template", action="store_true",
+                        help="start every browser on a copy of a user-data-dir warmed "
+                             "up once for the run (first run done, app in the HTTP cache)")
+    parser.add_argument("--cache", action="store_true",
+                        help="report tests whose source and front-end dependencies are "
+                             "unchanged since they last passed from the result cache")
+    parser.add_argument("--force", action="store_true",
+                        help="with --cache, run every test anyway and refresh the cache")
+    parser.add_argument("--shard-manifest",
+                        help="only run the tests of this manifest written by timing_history.py")
+    parser.add_argument("--json", dest="json_path",
+                        help="also write the merged results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        # Inherited by the worker processes
+        os.environ["SVQ_PROFILE"] = args.profile
+    if args.serve_dist:
+        # Picked up by config on import, before any worker is started
+        os.environ["SVQ_SERVE_DIST"] = "1"
+    if args.profile_template:
+        os.environ["SVQ_PROFILE_TEMPLATE"] = "1"
+    if args.shard_manifest:
+        test_ids = load_manifest(args.shard_manifest)
+    else:
+        test_ids = discover(args.modules or SUITE_MODULES + (DIST_MODULES if args.serve_dist else []))
+    if args.patterns:
+        test_ids = [test_id for test_id in test_ids
+                    if any(pattern in test_id for pattern in args.patterns)]
+
+    # Registers the merge of the workers' trace parts when SVQ_TRACE is set
+    instrumentation.get_tracer()
+    if os.environ.get("SVQ_PROFILE_TEMPLATE"):
+        # Imported here: it loads config, which must see SVQ_SERVE_DIST first
+        import profile_template
+
+        # Built once here and found by the workers through the environment
+        profile_template.template_dir(chrome_options())
+
+    cache = ResultCache() if args.cache else None
+    records = []
+    to_run = test_ids
+    if cache and not args.force:
+        to_run = []
+        for test_id in test_ids:
+            cached = cache.lookup(test_id)
+            if cached:
+                records.append({**cached, "cached": True})
+            else:
+                to_run.append(test_id)
+        if records:
+            sys.stderr.write(f"{len(records)} unchanged test(s) reported from cache\n")
+
+    history = TimingHistory()
+    # Slow tests first, so the last ones to finish are short
+    to_run = longest_first(to_run, history.estimates(to_run))
+
+    started = time.perf_counter()
+    for record in run_parallel(to_run, min(args.workers, len(to_run) or 1)):
+        records.append(record)
+        if cache:
+            cache.store(record)
+        sys.stderr.write(STATUS_MARKS[record["status"]])
+        sys.stderr.flush()
+    sys.stderr.write("\n")
+    elapsed = time.perf_counter() - started
+    if cache:
+        cache.save()
+    history.record(records)
+    history.close()
+
+    order = {test_id: index for index, test_id in enumerate(test_ids)}
+    records.sort(key=lambda record: order.get(record["id"], len(order)))
+    ok = report(records, elapsed)
+
+    if args.json_path:
+        with open(args.json_path, "w") as fp:
+            json.dump({"elapsed": elapsed, "results": records}, fp, indent=2)
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import functools
+import gzip
+import hashlib
+import os
+import shlex
+import subprocess
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+DIST_DIR = os.path.join(REPO_ROOT, "dist")
+HASH_FILE = os.path.join(DIST_DIR, ".svq-source-hash")
+
+BUILD_COMMAND = os.environ.get("SVQ_BUILD_COMMAND", "npm run build")
+
+# Everything besides src/ that changes what vite build produces
+BUILD_INPUTS = [
+    "index.html",
+    "package-lock.json",
+    "vite.config.ts",
+    "tsconfig.json",
+    "tsconfig.app.json",
+    "tsconfig.node.json",
+    "public",
+]
+
+
+def source_hash() -> str:
+    """Content hash of src/ and the other build inputs"""
+    digest = hashlib.sha256()
+    paths = []
+    for name in ["src"] + BUILD_INPUTS:
+        path = os.path.join(REPO_ROOT, name)
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                paths.extend(os.path.join(root, file) for file in sorted(files))
+        elif os.path.exists(path):
+            paths.append(path)
+    for path in paths:
+        digest.update(os.path.relpath(path, REPO_ROOT).encode())
+        with open(path, "rb") as fp:
+            digest.update(hashlib.sha256(fp.read()).digest())
+    return digest.hexdigest()
+
+
+def ensure_build() -> str:
+    """Build dist/ unless the existing build was made from the same sources"""
+    current = source_hash()
+    try:
+        with open(HASH_FILE) as fp:
+            if fp.read().strip() == current and os.path.exists(os.path.join(DIST_DIR, "index.html")):
+                return DIST_DIR
+    except FileNotFoundError:
+        pass
+
+    print(f"Building the app with '{BUILD_COMMAND}'", file=sys.stderr)
+    subprocess.run(shlex.split(BUILD_COMMAND), cwd=REPO_ROOT, check=True)
+    with open(HASH_FILE, "w") as fp:
+        fp.write(current)
+    return DIST_DIR
+
+
+def bundle_size(dist: str = DIST_DIR) -> dict:
+    """Raw and gzipped bytes of the JS a build ships, read from disk"""
+    raw = compressed = 0
+    assets = os.path.join(dist, "assets")
+    for name in os.listdir(assets):
+        if name.endswith(".js"):
+            with open(os.path.join(assets, name), "rb") as fp:
+                data = fp.read()
+            raw += len(data)
+            compressed += len(gzip.compress(data, compresslevel=6))
+    return {"js_bytes": raw, "js_gzip_bytes": compressed}
+
+
+class SpaRequestHandler(SimpleHTTPRequestHandler):
+    """Serves files from dist/ and index.html for client side routes"""
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.exists(path):
+            self.path = "/index.html"
+        return super().send_head()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StaticServer:
+    def __init__(self, directory: str = DIST_DIR, host: str = "127.0.0.1", port: int = 0):
+        handler = functools.partial(SpaRequestHandler, directory=directory)
+        # Port 0 lets the OS pick a free port
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StaticServer":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+_server = None
+
+
+def serve_dist() -> str:
+    """Start (once per process) a static server for the production build"""
+    global _server
+    if _server is None:
+        _server = StaticServer(ensure_build()).start()
+    return _server.base_url
@@ -0,0 +1,77 @@
+import math
+import random
+
+
+def percentile(values, p: float) -> float:
+    """p-th percentile (0-100) with linear interpolation between ranks"""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def describe(values) -> dict:
+    """count, mean and the percentiles we report for latency samples"""
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else math.nan,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else math.nan,
+    }
+
+
+def mann_whitney(baseline, current) -> dict:
+    """One-sided Mann-Whitney U test that current tends to be larger than baseline
+
+    Uses the normal approximation with tie and continuity corrections, which
+    is accurate from roughly ten samples per side. Also returns Cliff's delta
+    (-1..1, positive when current is larger) as the effect size.
+    """
+    n1, n2 = len(baseline), len(current)
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    ranks = [0.0] * len(combined)
+    ties = 0.0
+    start = 0
+    while start < len(combined):
+        end = start
+        while end + 1 < len(combined) and combined[end + 1][0] == combined[start][0]:
+            end += 1
+        for index in range(start, end + 1):
+            ranks[index] = (start + end) / 2 + 1
+        count = end - start + 1
+        ties += count ** 3 - count
+        start = end + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        p = 0.5
+    else:
+        z = (u - mean - 0.5) / math.sqrt(variance)
+        p = 0.5 * math.erfc(z / math.sqrt(2))
+    return {"u": u, "p": p, "cliffs_delta": 2 * u / (n1 * n2) - 1}
+
+
+def bootstrap_ratio(baseline, current, stat=None, iterations: int = 2000,
+                    confidence: float = 0.95, seed: int = 0) -> dict:
+    """Ratio of current to baseline medians with a percentile bootstrap interval"""
+    stat = stat or (lambda values: percentile(values, 50))
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(iterations):
+        resampled_baseline = [rng.choice(baseline) for _ in baseline]
+        resampled_current = [rng.choice(current) for _ in current]
+        ratios.append(stat(resampled_current) / stat(resampled_baseline))
+    tail = (1 - confidence) / 2 * 100
+    return {
+        "ratio": stat(current) / stat(baseline),
+        "low": percentile(ratios, tail),
+        "high": percentile(ratios, 100 - tail),
+    }
@@ -1,49 +1,62 @@
 import unittest
 import time 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException 
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+import config
+from base import SeleniumTestCase
+from dom_snapshot import by_testid, snapshot
+from interactions import fill_fields, toggle_and_await
+from pages import CreateSurveyPage
+import waits
+from waits import EventWait
 # from selenium.webdriver.common.action_chains import ActionChains
 
-class SurveyCreatorTest(unittest.TestCase):
+QUESTION_BLOCKS = "[data-testid^='question-block-']"
+
+
+class SurveyEditorHelpers:
+    """Element helpers shared by the survey editor suites"""
 
     def setUp(self):
-        options = ChromeOptions()
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-gpu")
-        # options.add_argument("--headless") 
-        options.add_argument("--window-size=1920,1080") 
-        service = ChromeService() 
-        self.driver = webdriver.Chrome(service=service, options=options)
-        self.driver.get("http://localhost:5173/create-survey")
-        self.wait = WebDriverWait(self.driver, 15) 
-
-    def tearDown(self):
-        self.driver.quit()
+        super().setUp()
+        self.wait = EventWait(self.driver, 15)
+        self.page = CreateSurveyPage(self.driver)
 
     def find_element(self, by, value):
-        return self.wait.until(EC.presence_of_element_located((by, value)))
+        return self.wait.until(waits.presence_of_element_located((by, value)))
 
     def find_visible_element(self, by, value):
-        return self.wait.until(EC.visibility_of_element_located((by, value)))
+        return self.wait.until(waits.visibility_of_element_located((by, value)))
     
     def find_clickable_element(self, by, value):
-        return self.wait.until(EC.element_to_be_clickable((by, value)))
+        return self.wait.until(waits.element_to_be_clickable((by, value)))
 
-    def test_survey_title_validation(self):
+    def _add_question_and_get_id(self, question_type_button_testid):
+
+        add_button = self.page.by_testid(question_type_button_testid, "clickable")
+        add_button.click()
+
+        question_blocks = snapshot(self.driver, {
+            "blocks": (QUESTION_BLOCKS, ["count", "last:element", "last:attr:data-testid"])
+        })["blocks"]
+        self.assertTrue(question_blocks["count"] > 0, "Question block was not added")
+        new_question_block = question_blocks["last:element"] # Get the last added question
+        question_id = question_blocks["last:attr:data-testid"].replace("question-block-", "")
+        return question_id, new_question_block
+
+
+class SurveyCreatorTest(SurveyEditorHelpers, SeleniumTestCase):
+
+    start_path = "/create-survey"
 
-        title_input_selector = "[data-testid='survey-title-input']"
-        save_button_selector = "[data-testid='save-survey-button']"
+    def test_survey_title_validation(self):
 
         error_empty_selector = "[data-testid='survey-title-error-empty']"
         error_long_selector = "[data-testid='survey-title-error-long']"
 
-        title_input = self.find_element(By.CSS_SELECTOR, title_input_selector)
-        save_button = self.find_clickable_element(By.CSS_SELECTOR, save_button_selector)
+        title_input = self.page.title
+        save_button = self.page.save
 
         # Test with empty title
         title_input.clear()
@@ -53,14 +66,11 @@ class SurveyCreatorTest(unittest.TestCase):
 
     def test_survey_title_validation(self):
 
-        title_input_selector = "[data-testid='survey-title-input']"
-        save_button_selector = "[data-testid='save-survey-button']"
-
         error_empty_selector = "[data-testid='survey-title-error-empty']"
         error_long_selector = "[data-testid='survey-title-error-long']"
 
-        title_input = self.find_element(By.CSS_SELECTOR, title_input_selector)
-        save_button = self.find_clickable_element(By.CSS_SELECTOR, save_button_selector)
+        title_input = self.page.title
+        save_button = self.page.save
         # Test with title longer than 30 characters
         title_input.clear()
         title_input.send_keys("This is a very very very very very long title that exceeds thirty characters")
@@ -70,14 +80,11 @@ class SurveyCreatorTest(unittest.TestCase):
 
     def test_survey_title_validation(self):
 
-        title_input_selector = "[data-testid='survey-title-input']"
-        save_button_selector = "[data-testid='save-survey-button']"
-
         error_empty_selector = "[data-testid='survey-title-error-empty']"
         error_long_selector = "[data-testid='survey-title-error-long']"
 
-        title_input = self.find_element(By.CSS_SELECTOR, title_input_selector)
-        save_button = self.find_clickable_element(By.CSS_SELECTOR, save_button_selector)
+        title_input = self.page.title
+        save_button = self.page.save
         # Test with a valid title
         title_input.clear()
         title_input.send_keys("Valid Survey Title")
@@ -86,18 +93,6 @@ class SurveyCreatorTest(unittest.TestCase):
         self.assertTrue(True)
 
 
-    def _add_question_and_get_id(self, question_type_button_testid):
-
-        add_button = self.find_clickable_element(By.CSS_SELECTOR, f"[data-testid='{question_type_button_testid}']")
-        add_button.click()
-
-        question_blocks = self.driver.find_elements(By.CSS_SELECTOR, "[data-testid^='question-block-']")
-        self.assertTrue(len(question_blocks) > 0, "Question block was not added")
-        new_question_block = question_blocks[-1] # Get the last added question
-        question_id = new_question_block.get_attribute("data-testid").replace("question-block-", "")
-        return question_id, new_question_block
-
-
     def test_add_all_question_types(self):
         """Test adding each type of question."""
         question_types_to_test = {
@@ -123,13 +118,13 @@ class SurveyCreatorTest(unittest.TestCase):
             }
         }
 
-        initial_question_count = len(self.driver.find_elements(By.CSS_SELECTOR, "[data-testid^='question-block-']"))
+        initial_question_count = snapshot(self.driver, {"blocks": (QUESTION_BLOCKS, "count")})["blocks"]
 
         for i, (q_type, details) in enumerate(question_types_to_test.items()):
             current_q_id, _ = self._add_question_and_get_id(details["button_testid"])
-            expected_element_selector = f"[data-testid='{details['expected_element_testid_pattern'].replace('{id}', current_q_id)}']"
+            expected_element_selector = by_testid(details['expected_element_testid_pattern'].replace('{id}', current_q_id))
             self.find_element(By.CSS_SELECTOR, expected_element_selector)
-            self.assertEqual(len(self.driver.find_elements(By.CSS_SELECTOR, "[data-testid^='question-block-']")), initial_question_count + i + 1)
+            self.assertEqual(snapshot(self.driver, {"blocks": (QUESTION_BLOCKS, "count")})["blocks"], initial_question_count + i + 1)
 
 
     def test_can_write_in_question_boxes(self):
@@ -142,15 +137,20 @@ class SurveyCreatorTest(unittest.TestCase):
 
         title_input = question_block.find_element(By.CSS_SELECTOR, title_input_selector)
         title_input.send_keys("What is your favorite color?")
-        self.assertEqual(title_input.get_attribute("value"), "What is your favorite color?")
 
         option_0_input = question_block.find_element(By.CSS_SELECTOR, option_0_input_selector)
         option_0_input.send_keys("Red")
-        self.assertEqual(option_0_input.get_attribute("value"), "Red")
+
+        values = snapshot(self.driver, {
+            "title": (title_input_selector, "value"),
+            "option_0": (option_0_input_selector, "value"),
+        })
+        self.assertEqual(values["title"], "What is your favorite color?")
+        self.assertEqual(values["option_0"], "Red")
 
     def test_save_survey_button_presence(self):
 
-        save_button = self.find_element(By.CSS_SELECTOR, "[data-testid='save-survey-button']")
+        save_button = self.page.by_testid("save-survey-button")
         self.assertTrue(save_button.is_displayed())
 
 
@@ -159,19 +159,18 @@ class SurveyCreatorTest(unittest.TestCase):
         # This is the URL of the page where the test starts
         initial_url = self.driver.current_url
   
-        expected_redirect_url_for_unauthenticated = "http://localhost:5173/"
+        expected_redirect_url_for_unauthenticated = config.url("/")
 
 
         self.assertTrue("/create-survey" in initial_url,
                         f"Test did not start on the /create-survey page. Current URL: {initial_url}")
 
-        back_button_selector = "[data-testid='back-to-dashboard-button']" 
-        back_button = self.find_clickable_element(By.CSS_SELECTOR, back_button_selector)
+        back_button = self.page.back
         back_button.click()
 
         try:
             # Wait for the URL to change to the expected redirect URL
-            self.wait.until(EC.url_to_be(expected_redirect_url_for_unauthenticated))
+            self.wait.until(waits.url_to_be(expected_redirect_url_for_unauthenticated))
 
             current_url_normalized = self.driver.current_url.rstrip('/')
             expected_redirect_normalized = expected_redirect_url_for_unauthenticated.rstrip('/')
@@ -183,7 +182,8 @@ class SurveyCreatorTest(unittest.TestCase):
         except TimeoutException:
             current_url_at_failure = self.driver.current_url
 
-            page_source_snippet = self.driver.page_source[0:500] if self.driver.page_source else "N/A"
+            page_source = self.driver.page_source
+            page_source_snippet = page_source[0:500] if page_source else "N/A"
             self.fail(
                 f"Failed to redirect to the expected root URL ('{expected_redirect_url_for_unauthenticated}').\n"
                 f"Initial URL was '{initial_url}'.\n"
@@ -208,30 +208,31 @@ class SurveyCreatorTest(unittest.TestCase):
 
     def test_add_conditional_logic(self):
 
-        source_q_id, source_q_block = self._add_question_and_get_id("add-question-multipleChoice-button")
-        source_q_title_input = source_q_block.find_element(By.CSS_SELECTOR, f"[data-testid='question-{source_q_id}-title-input']")
-        source_q_title_input.send_keys("Do you like Programming?")
-        source_q_option0_input = source_q_block.find_element(By.CSS_SELECTOR, f"[data-testid='question-{source_q_id}-option-0-input']")
-        source_q_option0_input.send_keys("Yes")
-        source_q_option1_input = source_q_block.find_element(By.CSS_SELECTOR, f"[data-testid='question-{source_q_id}-option-1-input']")
-        source_q_option1_input.send_keys("No")
+        source_q_id, _ = self._add_question_and_get_id("add-question-multipleChoice-button")
+        fill_fields(self.driver, {
+            (By.CSS_SELECTOR, by_testid(f"question-{source_q_id}-title-input")): "Do you like Programming?",
+            (By.CSS_SELECTOR, by_testid(f"question-{source_q_id}-option-0-input")): "Yes",
+            (By.CSS_SELECTOR, by_testid(f"question-{source_q_id}-option-1-input")): "No",
+        })
 
 
         # Add second question (e.g., Open Ended) - this will be the conditional question
-        target_q_id, target_q_block = self._add_question_and_get_id("add-question-openEnded-button")
-        target_q_title_input = target_q_block.find_element(By.CSS_SELECTOR, f"[data-testid='question-{target_q_id}-title-input']")
-        target_q_title_input.send_keys("Which language?")
+        target_q_id, _ = self._add_question_and_get_id("add-question-openEnded-button")
+        fill_fields(self.driver, {
+            (By.CSS_SELECTOR, by_testid(f"question-{target_q_id}-title-input")): "Which language?",
+        })
 
 
         # Open conditional logic for the target question
-        conditional_toggle_selector = f"[data-testid='conditional-logic-toggle-{target_q_id}']"
-        conditional_toggle = target_q_block.find_element(By.CSS_SELECTOR, conditional_toggle_selector)
-        conditional_toggle.click()
-        self.assertTrue(conditional_toggle.is_selected())
-
-        # Select the source question in the conditional logic dropdown
         cond_q_select_trigger_selector = f"[data-testid='conditional-question-select-trigger-{target_q_id}']"
-        cond_q_select_trigger = self.find_clickable_element(By.CSS_SELECTOR, cond_q_select_trigger_selector)
+        checked, cond_q_select_trigger = toggle_and_await(
+            self.driver, (By.CSS_SELECTOR, f"[data-testid='conditional-logic-toggle-{target_q_id}']"),
+            waits.element_to_be_clickable((By.CSS_SELECTOR, cond_q_select_trigger_selector)))
+        self.assertTrue(checked)
+
+        # Select the source question in the conditional logic dropdown. Radix
+        # selects open on pointerdown and pick an option on pointerup, which a
+        # DOM click() does not send; a WebDriver click sends the whole sequence
         cond_q_select_trigger.click()
 
         # Wait for dropdown content to be visible
@@ -0,0 +1,155 @@
+import argparse
+import heapq
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get("SVQ_TIMING_DB", os.path.join(HERE, ".svq-cache", "timings.sqlite3"))
+
+# Most recent runs a test's estimate is taken from
+RECENT_RUNS = 10
+
+# Estimate in seconds for a new test when nothing else is known
+DEFAULT_ESTIMATE = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    test_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_test_id ON runs (test_id, recorded_at);
+"""
+
+
+class TimingHistory:
+    """Durations of past test runs, kept in a local SQLite database"""
+
+    def __init__(self, path: str = DB_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def record(self, records):
+        """Store the durations of runner records (skipped and cached ones are left out)"""
+        now = time.time()
+        rows = [(record["id"], record["status"], record["duration"], now)
+                for record in records
+                if record["status"] != "skip" and not record.get("cached")]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO runs (test_id, status, duration, recorded_at) VALUES (?, ?, ?, ?)",
+                rows)
+
+    def known(self) -> dict:
+        """test id -> median duration of its most recent runs"""
+        rows = self.connection.execute("""
+            SELECT test_id, duration FROM (
+                SELECT test_id, duration,
+                       ROW_NUMBER() OVER (PARTITION BY test_id ORDER BY recorded_at DESC) AS age
+                FROM runs
+            ) WHERE age <= ?
+        """, (RECENT_RUNS,))
+        durations = {}
+        for test_id, duration in rows:
+            durations.setdefault(test_id, []).append(duration)
+        return {test_id: statistics.median(values) for test_id, values in durations.items()}
+
+    def estimates(self, test_ids) -> dict:
+        """Predicted duration of every test
+
+        Tests without history get the median of the other tests of their class,
+        failing that of their module, failing that of every known test.
+        """
+        known = self.known()
+        fallback = statistics.median(known.values()) if known else DEFAULT_ESTIMATE
+
+        def group_median(prefix):
+            values = [duration for test_id, duration in known.items()
+                      if test_id.startswith(prefix + ".")]
+            return statistics.median(values) if values else None
+
+        estimates = {}
+        for test_id in test_ids:
+            if test_id in known:
+                estimates[test_id] = known[test_id]
+                continue
+            module, cls, _ = test_id.rsplit(".", 2)
+            estimate = group_median(f"{module}.{cls}")
+            if estimate is None:
+                estimate = group_median(module)
+            estimates[test_id] = fallback if estimate is None else estimate
+        return estimates
+
+
+def longest_first(test_ids, estimates: dict) -> list:
+    return sorted(test_ids, key=lambda test_id: -estimates[test_id])
+
+
+def plan(test_ids, shards: int, estimates: dict) -> list:
+    """Split the tests into shards of near-equal predicted runtime
+
+    Longest processing time first: each test, longest first, goes to the shard
+    with the least predicted work so far.
+    """
+    if shards < 1:
+        raise ValueError(f"need at least one shard, got {shards}")
+    buckets = [{"shard": index + 1, "of": shards, "estimate_s": 0.0, "tests": []}
+               for index in range(shards)]
+    heap = [(0.0, index) for index in range(shards)]
+    for test_id in longest_first(test_ids, estimates):
+        load, index = heapq.heappop(heap)
+        buckets[index]["tests"].append(test_id)
+        load += estimates[test_id]
+        buckets[index]["estimate_s"] = load
+        heapq.heappush(heap, (load, index))
+    return buckets
+
+
+def load_manifest(path: str) -> list:
+    with open(path) as fp:
+        return json.load(fp)["tests"]
+
+
+def main(argv=None):
+    import runner
+
+    parser = argparse.ArgumentParser(
+        description="Split the selenium suites into shards of near-equal predicted runtime")
+    parser.add_argument("-k", "--shards", type=int, required=True)
+    parser.add_argument("-m", "--module", action="append", dest="modules",
+                        help="suite module to include, may be repeated (default: all)")
+    parser.add_argument("-o", "--output", default="shards",
+                        help="directory the shard-N.json manifests are written to")
+    parser.add_argument("--db", default=DB_PATH, help="timing history database")
+    args = parser.parse_args(argv)
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+
+    test_ids = runner.discover(args.modules or runner.SUITE_MODULES)
+    history = TimingHistory(args.db)
+    try:
+        estimates = history.estimates(test_ids)
+    finally:
+        history.close()
+    shards = plan(test_ids, args.shards, estimates)
+
+    os.makedirs(args.output, exist_ok=True)
+    for shard in shards:
+        path = os.path.join(args.output, f"shard-{shard['shard']}.json")
+        with open(path, "w") as fp:
+            json.dump(shard, fp, indent=2)
+        print(f"{path}: {len(shard['tests'])} tests, ~{shard['estimate_s']:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
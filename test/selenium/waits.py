@@ -0,0 +1,207 @@
+import time
+from selenium.common.exceptions import JavascriptException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from instrumentation import get_tracer
+
+# Locator lookup and the element conditions, shared with interactions.py
+LOCATE_FUNCTIONS = """
+function find(by, value) {
+    switch (by) {
+        case "id":
+            return document.getElementById(value);
+        case "css selector":
+            return document.querySelector(value);
+        case "xpath":
+            return document.evaluate(
+                value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+            ).singleNodeValue;
+        case "name":
+            return document.getElementsByName(value)[0] || null;
+        case "class name":
+            return document.getElementsByClassName(value)[0] || null;
+        case "tag name":
+            return document.getElementsByTagName(value)[0] || null;
+    }
+    throw new Error("Unsupported locator strategy: " + by);
+}
+
+function isVisible(element) {
+    if (element.getClientRects().length === 0) {
+        return false;
+    }
+    if (typeof element.checkVisibility === "function") {
+        return element.checkVisibility({ opacityProperty: true, visibilityProperty: true });
+    }
+    const style = window.getComputedStyle(element);
+    return style.visibility !== "hidden" && style.display !== "none" && style.opacity !== "0";
+}
+
+// What a locator condition resolves to: the element for present, visible
+// and clickable, true for absent; null while the condition does not hold
+function locate(kind, by, value) {
+    const element = find(by, value);
+    if (kind === "absent") {
+        return element ? null : true;
+    }
+    if (!element || kind === "present") {
+        return element;
+    }
+    if (!isVisible(element)) {
+        return null;
+    }
+    if (kind === "visible") {
+        return element;
+    }
+    return element.disabled ? null : element;
+}
+"""
+
+# Resolves as soon as the condition holds: checked once up front, then on
+# every DOM mutation and every animation frame (for style and url changes
+# that do not mutate the DOM). Returns null when the timeout elapses.
+WAIT_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const [kind, by, value, timeout] = arguments;
+""" + LOCATE_FUNCTIONS + """
+function check() {
+    if (kind === "url") {
+        return window.location.href === value ? true : null;
+    }
+    if (kind === "url_contains") {
+        return window.location.href.includes(value) ? true : null;
+    }
+    return locate(kind, by, value);
+}
+
+const initial = check();
+if (initial !== null) {
+    return done(initial);
+}
+
+let finished = false;
+let frame = null;
+let timer = null;
+const observer = new MutationObserver(tick);
+
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observer.disconnect();
+    cancelAnimationFrame(frame);
+    clearTimeout(timer);
+    done(result);
+}
+
+function tick() {
+    const result = check();
+    if (result !== null) {
+        finish(result);
+    }
+}
+
+function onFrame() {
+    tick();
+    if (!finished) {
+        frame = requestAnimationFrame(onFrame);
+    }
+}
+
+observer.observe(document, {
+    childList: true,
+    subtree: true,
+    attributes: true,
+    characterData: true,
+});
+frame = requestAnimationFrame(onFrame);
+timer = setTimeout(() => finish(null), timeout);
+"""
+
+
+class PageCondition:
+    """A wait condition evaluated inside the page by EventWait"""
+
+    def __init__(self, kind: str, by: str = None, value: str = None):
+        self.kind = kind
+        self.by = by
+        self.value = value
+
+    def __repr__(self):
+        return f"PageCondition({self.kind!r}, {self.by!r}, {self.value!r})"
+
+
+def presence_of_element_located(locator) -> PageCondition:
+    return PageCondition("present", *locator)
+
+
+def visibility_of_element_located(locator) -> PageCondition:
+    return PageCondition("visible", *locator)
+
+
+def element_to_be_clickable(locator) -> PageCondition:
+    return PageCondition("clickable", *locator)
+
+
+def absence_of_element_located(locator) -> PageCondition:
+    return PageCondition("absent", *locator)
+
+
+def url_to_be(url: str) -> PageCondition:
+    return PageCondition("url", value=url)
+
+
+def url_contains(url: str) -> PageCondition:
+    return PageCondition("url_contains", value=url)
+
+
+def ensure_script_timeout(driver, seconds: float):
+    """Let async scripts run for seconds, raising the session's limit only when needed"""
+    current = getattr(driver, "_event_wait_script_timeout", 0)
+    if current < seconds + 1:
+        driver.set_script_timeout(max(seconds + 1, 30))
+        driver._event_wait_script_timeout = max(seconds + 1, 30)
+
+
+class EventWait:
+    """Drop-in for WebDriverWait that waits inside the page instead of polling
+
+    Conditions from this module are resolved by a MutationObserver in a single
+    execute_async_script call, so the wait returns the moment the condition
+    holds. Any other callable falls back to a regular WebDriverWait.
+    """
+
+    def __init__(self, driver, timeout: float = 10):
+        self.driver = driver
+        self.timeout = timeout
+
+    def until(self, condition, message: str = ""):
+        with get_tracer().span("wait", getattr(condition, "kind", "callable"),
+                               condition=repr(condition)):
+            return self._until(condition, message)
+
+    def _until(self, condition, message: str):
+        if not isinstance(condition, PageCondition):
+            return WebDriverWait(self.driver, self.timeout).until(condition, message)
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ensure_script_timeout(self.driver, remaining)
+            try:
+                result = self.driver.execute_async_script(
+                    WAIT_SCRIPT, condition.kind, condition.by, condition.value,
+                    int(remaining * 1000))
+            except JavascriptException as error:
+                # A navigation unloaded the document mid-wait, retry on the new page
+                if "unloaded" not in str(error.msg):
+                    raise
+                continue
+            if result is not None:
+                return result
+            break
+
+        raise TimeoutException(message or f"Timed out waiting for {condition!r}")
@@ -0,0 +1,296 @@
+import argparse
+import gzip
+import http.client
+import json
+import os
+import re
+import sys
+import time
+from urllib.parse import urlsplit
+from selenium.webdriver.chrome.service import Service as ChromeService
+
+import config
+from driver_pool import RESET_SCRIPT
+from profiles import PROFILES, chrome_options
+from stats import describe
+
+ELEMENT_KEY = "element-6066-11e4-a52f-4099b8ac6bf5"
+
+SESSION_PATH = re.compile(r"^/session/[^/]+")
+SYMBOL = re.compile(r"\$e\d+")
+
+# How long a replayed find may retry when the page is behind the recording
+FIND_RETRY_SECONDS = 5
+
+
+def recording_path(test_id: str) -> str:
+    return os.path.join(config.RECORD_DIR, f"{test_id}.jsonl.gz")
+
+
+class WireRecorder:
+    """Captures the HTTP commands a driver sends, with element ids as symbols
+
+    Element ids from responses are replaced by $e1, $e2, ... wherever they
+    appear afterwards (paths and script arguments), and the base url by
+    {base}, so the stream can be replayed against another session or build.
+    """
+
+    def __init__(self, driver, test_id: str, start_path: str, local_storage: dict = None):
+        self.driver = driver
+        self.header = {
+            "version": 1,
+            "test": test_id,
+            "start_path": start_path,
+            "local_storage": local_storage or {},
+            "capabilities": driver.caps,
+        }
+        self.entries = []
+        self.symbols = {}
+        self.connection = driver.command_executor
+        self.send = self.connection._request
+        self.last_end = time.perf_counter()
+        self.started = self.last_end
+        self.connection._request = self._request
+
+    def _request(self, method, url, body=None):
+        started = time.perf_counter()
+        response = self.send(method, url, body)
+        ended = time.perf_counter()
+
+        path = SESSION_PATH.sub("/session/{session}", urlsplit(url).path)
+        if path == "/session/{session}" and method == "DELETE":
+            return response
+        entry = {
+            "t": round(started - self.started, 4),
+            "think": round(started - self.last_end, 4),
+            "ms": round((ended - started) * 1000, 2),
+            "m": method,
+            "p": "/".join(self.symbols.get(part, part) for part in path.split("/")),
+            "s": "ok",
+        }
+        status = response.get("status")
+        if isinstance(status, int) and status >= 400:
+            entry["s"] = status
+        if body and method in ("POST", "PUT"):
+            entry["b"] = self._symbolize(json.loads(body))
+        if entry["s"] == "ok":
+            skeleton = self._bind(response.get("value"))
+            if skeleton is not None:
+                entry["r"] = skeleton
+        self.entries.append(entry)
+        self.last_end = ended
+        return response
+
+    def _symbolize(self, value):
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return {ELEMENT_KEY: self.symbols.get(value[ELEMENT_KEY], value[ELEMENT_KEY])}
+            return {key: self._symbolize(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._symbolize(item) for item in value]
+        if isinstance(value, str) and value.startswith(config.BASE_URL):
+            return "{base}" + value[len(config.BASE_URL):]
+        return value
+
+    def _bind(self, value):
+        """The response shape with new element ids given symbols, None without elements"""
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                element_id = value[ELEMENT_KEY]
+                if element_id not in self.symbols:
+                    self.symbols[element_id] = f"$e{len(self.symbols) + 1}"
+                return {ELEMENT_KEY: self.symbols[element_id]}
+            bound = {key: self._bind(item) for key, item in value.items()}
+            return {key: item for key, item in bound.items() if item is not None} or None
+        if isinstance(value, list):
+            bound = [self._bind(item) for item in value]
+            return bound if any(item is not None for item in bound) else None
+        return None
+
+    def stop(self, path: str = None):
+        """Stop recording and write the stream to path (gzipped JSON lines)"""
+        del self.connection._request
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wt") as fp:
+            fp.write(json.dumps(self.header) + "\n")
+            for entry in self.entries:
+                fp.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+def load_recording(path: str) -> tuple:
+    with gzip.open(path, "rt") as fp:
+        header = json.loads(fp.readline())
+        return header, [json.loads(line) for line in fp]
+
+
+class Replayer:
+    """Plays a recorded stream against a fresh session over one keep-alive connection"""
+
+    def __init__(self, service_url: str, profile: str, base_url: str = config.BASE_URL):
+        address = urlsplit(service_url)
+        self.connection = http.client.HTTPConnection(address.hostname, address.port)
+        self.profile = profile
+        self.base_url = base_url.rstrip("/")
+        self.session_id = None
+        self.elements = {}
+
+    def request(self, method: str, path: str, body=None) -> tuple:
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json;charset=UTF-8"}
+        for attempt in range(2):
+            try:
+                self.connection.request(method, path, body=data, headers=headers)
+                response = self.connection.getresponse()
+                payload = response.read()
+                return response.status, json.loads(payload) if payload else {}
+            except (http.client.HTTPException, ConnectionError):
+                self.connection.close()
+                if attempt:
+                    raise
+
+    def start(self, header: dict):
+        capabilities = chrome_options(self.profile).to_capabilities()
+        status, payload = self.request("POST", "/session", {"capabilities": {"alwaysMatch": capabilities}})
+        if status != 200:
+            raise RuntimeError(f"Could not start a session: {payload}")
+        self.session_id = payload["value"]["sessionId"]
+        self.elements = {}
+        # Same starting state as the recorded test got from DriverPool.acquire
+        self.command("POST", "/url", {"url": self.base_url})
+        self.command("POST", "/execute/sync", {
+            "script": RESET_SCRIPT,
+            "args": [self._origin(), header["local_storage"]]})
+        self.command("POST", "/url", {"url": self.base_url + header["start_path"]})
+
+    def _origin(self) -> str:
+        return "{0.scheme}://{0.netloc}".format(urlsplit(self.base_url))
+
+    def command(self, method: str, path: str, body=None) -> tuple:
+        return self.request(method, f"/session/{self.session_id}{path}", body)
+
+    def stop(self):
+        if self.session_id:
+            self.request("DELETE", f"/session/{self.session_id}")
+            self.session_id = None
+        self.connection.close()
+
+    def _resolve(self, value):
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return {ELEMENT_KEY: self.elements[value[ELEMENT_KEY]]}
+            return {key: self._resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._resolve(item) for item in value]
+        if isinstance(value, str) and value.startswith("{base}"):
+            return self.base_url + value[len("{base}"):]
+        return value
+
+    def _learn(self, skeleton, value):
+        """Bind the symbols of the recorded response shape to the new element ids"""
+        if isinstance(skeleton, dict) and isinstance(value, dict):
+            if ELEMENT_KEY in skeleton:
+                if ELEMENT_KEY in value:
+                    self.elements[skeleton[ELEMENT_KEY]] = value[ELEMENT_KEY]
+                return
+            for key, item in skeleton.items():
+                self._learn(item, value.get(key))
+        elif isinstance(skeleton, list) and isinstance(value, list):
+            for item, actual in zip(skeleton, value):
+                self._learn(item, actual)
+
+    def replay(self, entries: list, speed: float = 0) -> dict:
+        """Send every command; speed > 0 keeps the recorded think time divided by speed"""
+        timings = {}
+        divergences = []
+        started = time.perf_counter()
+        for index, entry in enumerate(entries):
+            if speed > 0 and entry["think"] > 0:
+                time.sleep(entry["think"] / speed)
+            path = entry["p"].replace("/session/{session}", "")
+            try:
+                path = "/".join(self.elements[part] if part.startswith("$e") else part
+                                for part in path.split("/"))
+                body = self._resolve(entry.get("b"))
+            except KeyError as missing:
+                divergences.append({"index": index, "path": entry["p"],
+                                    "reason": f"element {missing} was never found"})
+                continue
+
+            command_started = time.perf_counter()
+            deadline = command_started + FIND_RETRY_SECONDS
+            while True:
+                status, payload = self.command(entry["m"], path, body)
+                failed = status != 200
+                if not (failed and entry["s"] == "ok" and entry["p"].endswith(("/element", "/elements"))
+                        and time.perf_counter() < deadline):
+                    break
+                # The page is behind the recording, let it catch up
+                time.sleep(0.05)
+            elapsed = (time.perf_counter() - command_started) * 1000
+
+            name = SYMBOL.sub("{element}", f"{entry['m']} {entry['p']}")
+            timings.setdefault(name, []).append(elapsed)
+            if failed != (entry["s"] != "ok"):
+                divergences.append({"index": index, "path": entry["p"], "recorded": entry["s"],
+                                    "replayed": status, "value": str(payload.get("value"))[:200]})
+            elif "r" in entry:
+                self._learn(entry["r"], payload.get("value"))
+
+        return {
+            "total_ms": (time.perf_counter() - started) * 1000,
+            "commands": {name: describe(samples) for name, samples in timings.items()},
+            "divergences": divergences,
+        }
+
+
+def replay_file(path: str, repeat: int = 1, speed: float = 0, profile: str = "fast",
+                base_url: str = config.BASE_URL) -> list:
+    header, entries = load_recording(path)
+    service = ChromeService()
+    service.start()
+    runs = []
+    try:
+        for _ in range(repeat):
+            replayer = Replayer(service.service_url, profile, base_url)
+            replayer.start(header)
+            try:
+                runs.append(replayer.replay(entries, speed))
+            finally:
+                replayer.stop()
+    finally:
+        service.stop()
+    return runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded WebDriver command stream and time the app and browser")
+    parser.add_argument("recording", help="a .jsonl.gz file written with SVQ_RECORD set")
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("--speed", type=float, default=0,
+                        help="keep the recorded pauses between commands, divided by this "
+                             "(default: 0, no pauses)")
+    parser.add_argument("--base-url", default=config.BASE_URL,
+                        help="app to replay against, e.g. another build (default: %(default)s)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast")
+    parser.add_argument("--json", dest="json_path", help="also write every run to this file")
+    args = parser.parse_args(argv)
+
+    runs = replay_file(args.recording, args.repeat, args.speed, args.profile, args.base_url)
+    totals = describe([run["total_ms"] for run in runs])
+    print(f"{len(runs)} replays against {args.base_url}: p50 {totals['p50']:.0f} ms, "
+          f"p95 {totals['p95']:.0f} ms, max {totals['max']:.0f} ms")
+    diverged = [run for run in runs if run["divergences"]]
+    for run in diverged[:1]:
+        for divergence in run["divergences"][:10]:
+            print(f"  diverged: {divergence}", file=sys.stderr)
+    if args.json_path:
+        with open(args.json_path, "w") as fp:
+            json.dump(runs, fp, indent=2)
+    return 1 if diverged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())